@@ -5,19 +5,103 @@ This module handles adding and removing database connections to Django's
 connections registry at runtime, allowing users to manage their own database
 configurations.
 """
+import hashlib
+import json
+import threading
+import weakref
+from collections import OrderedDict
+
 from django.db import connections
 from django.db.utils import OperationalError, ProgrammingError
-from .models import DatabaseConfig
+from django.utils.crypto import salted_hmac
+from .models import DatabaseConfig, LIBPQ_CONNECTION_OPTIONS
+
+# Warm psycopg2 pools used by test_database_connection, keyed by server, database, user
+# and a digest of the password, so repeated tests against the same server skip the
+# TCP/auth handshake. Least recently used first; capped so parameter sets that are
+# tested once (typos, unsaved or superseded configs) do not keep backends open.
+_test_pools = OrderedDict()
+_test_pools_lock = threading.Lock()
+_TEST_POOL_LIMIT = 4
+# Pooled test connections that have been handed out at least once
+_reused_test_conns = weakref.WeakSet()
+
+# Settings keys that determine which server/session a connection talks to
+_CONNECTION_PARAM_KEYS = ('HOST', 'PORT', 'NAME', 'USER', 'PASSWORD', 'OPTIONS')
+
+# Seconds libpq may spend connecting during a connection test; shorter than for normal
+# connections so an unreachable host fails the form quickly instead of holding a worker
+_TEST_CONNECT_TIMEOUT = 3
+
+# Hash of the config last written to connections.databases, per alias
+_applied_hash = {}
+
+
+def _test_connect_kwargs(host, port, database, username, password):
+    """psycopg2.connect() arguments for a connection test."""
+    return dict(
+        LIBPQ_CONNECTION_OPTIONS,
+        host=host,
+        port=port,
+        database=database,
+        user=username,
+        password=password,
+        connect_timeout=_TEST_CONNECT_TIMEOUT,
+        # Bound the probe queries so a wedged server cannot stall the request
+        options='-c statement_timeout=5000',
+    )
+
+
+def _get_test_pool(host, port, database, username, password):
+    """Return the shared test pool for these parameters, creating it on first use."""
+    import psycopg2.pool
+
+    key = (host, str(port), database, username, hashlib.sha256(str(password).encode()).hexdigest())
+    evicted = []
+    with _test_pools_lock:
+        pool = _test_pools.get(key)
+        if pool is None or pool.closed:
+            # minconn=1 keeps one idle connection warm between tests
+            pool = psycopg2.pool.ThreadedConnectionPool(
+                1, 4, **_test_connect_kwargs(host, port, database, username, password)
+            )
+            _test_pools[key] = pool
+            while len(_test_pools) > _TEST_POOL_LIMIT:
+                evicted.append(_test_pools.popitem(last=False)[1])
+        else:
+            _test_pools.move_to_end(key)
+    _close_pools(evicted)
+    return pool
+
+
+def _close_pools(pools):
+    for pool in pools:
+        try:
+            pool.closeall()
+        except Exception:
+            pass
 
 
-def ensure_database_connection(db_alias, user=None):
+def close_test_pools(host, port, database, username):
+    """Close and forget all test pools for the given server/database/user."""
+    with _test_pools_lock:
+        stale = [k for k in _test_pools if k[:4] == (host, str(port), database, username)]
+        pools = [_test_pools.pop(k) for k in stale]
+    _close_pools(pools)
+
+
+def ensure_database_connection(db_alias, user=None, db_config=None):
     """
     Ensure a database connection exists in Django's connections registry.
-    Always updates the config to ensure it has all required Django settings.
+    The registry entry is rewritten only when the stored config changed, and the
+    open connection is only closed when the connection parameters changed, so
+    persistent connections survive across requests.
     
     Args:
         db_alias: The database alias to ensure exists
         user: Optional User instance to verify ownership
+        db_config: Optional DatabaseConfig already loaded (and ownership-checked)
+            by the caller; skips the lookup query
     
     Returns:
         bool: True if connection exists and is accessible, False otherwise
@@ -26,21 +110,56 @@ def ensure_database_connection(db_alias, user=None):
         DatabaseConfig.DoesNotExist: If db_alias doesn't exist for the user
     """
     # Load database config from model
-    if user is not None:
+    if db_config is not None:
+        if db_config.alias != db_alias or (user is not None and db_config.user_id != user.pk):
+            raise DatabaseConfig.DoesNotExist(f"Database config does not match alias '{db_alias}'")
+    elif user is not None:
         db_config = DatabaseConfig.objects.get(user=user, alias=db_alias)
     else:
         # Try to find by alias (less secure, but needed for some operations)
         db_config = DatabaseConfig.objects.get(alias=db_alias)
     
+    _apply_connection_config(db_alias, db_config)
+    return True
+
+
+def _apply_connection_config(db_alias, db_config):
+    """Write a config's connection settings to the registry, closing the connection if its parameters changed."""
+    # Hash the stored fields with the password still encrypted, so an unchanged
+    # config is recognised without paying for a decrypt on every request.
+    config_hash = _config_hash(db_config.get_connection_state())
+    if _applied_hash.get(db_alias) == config_hash and db_alias in connections.databases:
+        # Registry already holds this exact config; nothing to do
+        return
+    new_config = db_config.get_connection_config()
+    old_config = connections.databases.get(db_alias)
+    
     # Always update the config in the registry to ensure it has all required settings
     # This is important because Django expects certain keys like ATOMIC_REQUESTS and TIME_ZONE
-    connections.databases[db_alias] = db_config.get_connection_config()
+    connections.databases[db_alias] = new_config
     
-    # Close any existing connection to force reconnection with new config
-    if db_alias in connections:
-        connections[db_alias].close()
+    # Drop the existing connection only if it was opened with different parameters;
+    # the cached wrapper keeps its own settings dict, so it must be discarded too.
+    if old_config is not None and _connection_params_changed(old_config, new_config):
+        if db_alias in connections:
+            connections[db_alias].close()
+            del connections[db_alias]
     
-    return True
+    _applied_hash[db_alias] = config_hash
+
+
+def _config_hash(config):
+    """Return a short stable digest of a connection config snapshot."""
+    payload = json.dumps(config, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _connection_params_changed(old_config, new_config):
+    """Return True if two connection config dicts would open different connections."""
+    return any(
+        old_config.get(key) != new_config.get(key)
+        for key in _CONNECTION_PARAM_KEYS
+    )
 
 
 def remove_database_connection(db_alias):
@@ -50,7 +169,11 @@ def remove_database_connection(db_alias):
     Args:
         db_alias: The database alias to remove
     """
+    _applied_hash.pop(db_alias, None)
     if db_alias in connections.databases and db_alias != 'default':
+        config = connections.databases[db_alias]
+        close_test_pools(config.get('HOST'), config.get('PORT'), config.get('NAME'), config.get('USER'))
+        
         # Close connection if open
         if db_alias in connections:
             try:
@@ -67,7 +190,8 @@ def test_database_connection(host, port, database, username, password, schema=No
     Test a database connection without saving it.
     
     Uses psycopg2 directly to avoid Django connection initialization issues
-    that can occur when settings aren't fully loaded.
+    that can occur when settings aren't fully loaded. Connections come from a
+    small per-server pool so repeated tests reuse an already authenticated backend.
     
     Args:
         host: Database host
@@ -80,40 +204,38 @@ def test_database_connection(host, port, database, username, password, schema=No
     Returns:
         tuple: (success: bool, error_message: str or None)
     """
-    import psycopg2
     from psycopg2 import OperationalError as PsycopgOperationalError, ProgrammingError as PsycopgProgrammingError
+    import psycopg2
+    import psycopg2.pool
     
     try:
         # Use psycopg2 directly for testing to avoid Django connection initialization issues
         # This bypasses Django's connection handler which might try to access settings.TIME_ZONE
-        conn = psycopg2.connect(
-            host=host,
-            port=port,
-            database=database,
-            user=username,
-            password=password,
-            connect_timeout=10
-        )
+        pool = _get_test_pool(host, port, database, username, password)
         
-        try:
-            with conn.cursor() as cursor:
-                cursor.execute("SELECT 1")
-                cursor.fetchone()
-                
-                # If schema is provided, verify it exists
-                if schema:
-                    cursor.execute("""
-                        SELECT schema_name
-                        FROM information_schema.schemata
-                        WHERE schema_name = %s
-                    """, [schema])
-                    if not cursor.fetchone():
-                        return False, f'Schema "{schema}" does not exist in database "{database}".'
-            
-            return True, None
-            
-        finally:
-            conn.close()
+        # A pooled connection may have been dropped by the server since its last use;
+        # retry once so a stale backend is replaced by a fresh one instead of failing the test.
+        for attempt in range(2):
+            try:
+                conn = pool.getconn()
+            except psycopg2.pool.PoolError:
+                # All pooled connections are busy with concurrent tests; use a one-off one
+                conn = psycopg2.connect(**_test_connect_kwargs(host, port, database, username, password))
+                try:
+                    return _check_connection(conn, database, schema)
+                finally:
+                    conn.close()
+            broken = False
+            try:
+                return _check_connection(conn, database, schema, reused=conn in _reused_test_conns)
+            except PsycopgOperationalError:
+                broken = True
+                if attempt:
+                    raise
+            finally:
+                _reused_test_conns.add(conn)
+                # Discard connections that failed so the pool never hands out a dead backend
+                pool.putconn(conn, close=broken or bool(conn.closed))
             
     except (PsycopgOperationalError, PsycopgProgrammingError) as e:
         return False, str(e)
@@ -121,6 +243,75 @@ def test_database_connection(host, port, database, username, password, schema=No
         return False, f"Connection error: {str(e)}"
 
 
+def _check_connection(conn, database, schema=None, reused=False):
+    """
+    Probe an open psycopg2 connection and optionally verify the schema exists.
+    A freshly opened connection already proves reachability and authentication,
+    so the liveness query is only issued for reused pooled connections.
+    """
+    if not schema and not reused:
+        return True, None
+    
+    with conn.cursor() as cursor:
+        # If schema is provided, verify it exists (this also proves the backend is alive)
+        if schema:
+            cursor.execute("""
+                SELECT schema_name
+                FROM information_schema.schemata
+                WHERE schema_name = %s
+            """, [schema])
+            if not cursor.fetchone():
+                return False, f'Schema "{schema}" does not exist in database "{database}".'
+        else:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    
+    return True, None
+
+
+def connection_fingerprint(host, port, database, username, password, schema=None):
+    """
+    Return a digest identifying a set of connection parameters (password included).
+
+    The digest is stored in the session, so it is keyed by SECRET_KEY to keep the
+    password from being brute-forced offline from a plain hash.
+    """
+    payload = "\x00".join(str(v) for v in (host, port, database, username, password, schema))
+    return salted_hmac("editor.connection-test", payload).hexdigest()
+
+
+def schedule_connection_test(config_pk):
+    """
+    Test a saved database configuration in a background thread.
+    
+    The outcome is written to last_tested_at/last_tested_ok so the request that
+    saved the configuration does not wait on a network round-trip.
+    
+    Args:
+        config_pk: Primary key of the DatabaseConfig to test
+    """
+    thread = threading.Thread(target=_record_connection_test, args=(config_pk,), daemon=True)
+    thread.start()
+
+
+def _record_connection_test(config_pk):
+    from django.utils import timezone
+    
+    try:
+        db_config = DatabaseConfig.objects.get(pk=config_pk)
+        success, _ = test_database_connection(
+            db_config.host, db_config.port, db_config.database,
+            db_config.username, db_config.password, schema=db_config.schema,
+        )
+        # update() avoids touching updated_at and racing with concurrent edits of other fields
+        DatabaseConfig.objects.filter(pk=config_pk).update(last_tested_at=timezone.now(), last_tested_ok=success)
+    except Exception:
+        pass
+    finally:
+        # Connections opened in this thread are not closed by the request cycle
+        connections.close_all()
+
+
 def load_user_databases(user):
     """
     Load all database connections for a user into Django's connections registry.
@@ -128,10 +319,18 @@ def load_user_databases(user):
     Args:
         user: User instance
     """
-    db_configs = DatabaseConfig.objects.filter(user=user)
+    # Apply the configs fetched here directly instead of re-querying each alias;
+    # registration is in-memory, so this runs in the request thread that owns the connections.
+    # Only the connection fields are loaded, streamed in chunks; the (user, alias)
+    # lookup is covered by the unique_together index.
+    db_configs = (
+        DatabaseConfig.objects.filter(user=user)
+        .only('alias', 'host', 'port', 'database', 'username', 'password')
+        .iterator(chunk_size=100)
+    )
     for db_config in db_configs:
         try:
-            ensure_database_connection(db_config.alias, user=user)
+            _apply_connection_config(db_config.alias, db_config)
         except Exception:
             # Skip databases that can't be loaded
             pass
@@ -1,6 +1,17 @@
+import re
+
 from django import forms
+from django.db.models import Q
+from django.utils import timezone
 from .models import DatabaseConfig
-from .db_manager import test_database_connection
+from .db_manager import connection_fingerprint, test_database_connection
+from .introspection import SYSTEM_SCHEMAS
+
+# Fields that determine which server, database and schema a config connects to
+CONNECTION_FIELDS = ('host', 'port', 'database', 'schema', 'username', 'password')
+
+# Letters, digits, underscores and hyphens
+_SCHEMA_RE = re.compile(r'[\w-]+')
 
 
 class DatabaseConfigForm(forms.ModelForm):
@@ -21,6 +32,10 @@ class DatabaseConfigForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop('user', None)
+        # Fingerprints of connections the user already tested successfully via the Test button
+        self.tested_connections = set(kwargs.pop('tested_connections', None) or ())
+        # Set by clean() when the connection was verified during this submit
+        self.connection_verified = False
         super().__init__(*args, **kwargs)
         # If editing, don't show password field unless user wants to change it
         if self.instance and self.instance.pk:
@@ -42,42 +57,48 @@ class DatabaseConfigForm(forms.ModelForm):
             raise forms.ValidationError("Schema name is required")
         
         # Check for valid PostgreSQL identifier
-        if not schema.replace('_', '').replace('-', '').isalnum():
+        if not _SCHEMA_RE.fullmatch(schema):
             raise forms.ValidationError("Schema name can only contain letters, numbers, underscores, and hyphens")
         
         # Check for reserved names
-        system_schemas = {'pg_catalog', 'information_schema', 'pg_toast'}
-        if schema.lower() in system_schemas or schema.lower().startswith('pg_'):
+        schema_lower = schema.lower()
+        if schema_lower in SYSTEM_SCHEMAS or schema_lower.startswith('pg_'):
             raise forms.ValidationError(f"Cannot use system schema '{schema}'")
         
         return schema
     
     def clean(self):
-        """Validate connection and ensure unique database+schema per user."""
+        """
+        Validate connection and ensure unique database+schema per user.
+        
+        The live connection test is skipped when the same parameters were already
+        tested successfully via the Test button, or when an edit leaves a previously
+        verified connection unchanged.
+        """
         cleaned_data = super().clean()
         
-        # Check for unique name per user
+        # Check for unique name and unique database+schema combination per user in one query
         name = cleaned_data.get('name')
-        if name and self.user:
-            qs = DatabaseConfig.objects.filter(user=self.user, name=name)
-            if self.instance and self.instance.pk:
-                qs = qs.exclude(pk=self.instance.pk)
-            if qs.exists():
-                raise forms.ValidationError({'name': 'You already have a database with this name.'})
-        
-        # Check for unique database+schema combination per user
         database = cleaned_data.get('database')
         schema = cleaned_data.get('schema')
-        if database and schema and self.user:
-            qs = DatabaseConfig.objects.filter(user=self.user, database=database, schema=schema)
+        if self.user and (name or (database and schema)):
+            conflict = Q()
+            if name:
+                conflict |= Q(name=name)
+            if database and schema:
+                conflict |= Q(database=database, schema=schema)
+            qs = DatabaseConfig.objects.filter(conflict, user=self.user)
             if self.instance and self.instance.pk:
                 qs = qs.exclude(pk=self.instance.pk)
-            if qs.exists():
+            matches = list(qs.values_list('name', 'database', 'schema')[:2])
+            if any(row[0] == name for row in matches):
+                raise forms.ValidationError({'name': 'You already have a database with this name.'})
+            if matches:
                 raise forms.ValidationError({
                     'schema': f'You already have a connection to database "{database}" with schema "{schema}".'
                 })
         
-        # Test connection - always test for new records, or if password provided, or if connection details changed
+        # Test connection unless these connection details were already verified
         password = cleaned_data.get('password')
         is_new = not (self.instance and self.instance.pk)
         
@@ -99,15 +120,32 @@ class DatabaseConfigForm(forms.ModelForm):
             schema = cleaned_data.get('schema')
             username = cleaned_data.get('username')
             
-            if all([host, port, database, username, schema]):
-                # Test connection and verify schema exists in one call
-                success, error = test_database_connection(host, port, database, username, test_password, schema=schema)
-                if not success:
-                    # Check if error is schema-related
-                    if 'does not exist' in error.lower() and 'schema' in error.lower():
-                        raise forms.ValidationError({'schema': error})
-                    else:
-                        raise forms.ValidationError(f"Connection test failed: {error}")
+            if not all([host, port, database, username, schema]):
+                return cleaned_data
+            
+            # Skip the live test when these exact parameters were just tested via the Test button
+            fingerprint = connection_fingerprint(host, port, database, username, test_password, schema)
+            if fingerprint in self.tested_connections:
+                self.connection_verified = True
+                return cleaned_data
+            
+            # Unchanged connection that already tested OK: the view re-tests it in the background
+            changed = set(self.changed_data)
+            if not password:
+                # A blank password on edit keeps the stored one
+                changed.discard('password')
+            if not is_new and self.instance.last_tested_ok and not changed.intersection(CONNECTION_FIELDS):
+                return cleaned_data
+            
+            # Not yet verified with these parameters: test connection and verify schema exists in one call
+            success, error = test_database_connection(host, port, database, username, test_password, schema=schema)
+            if not success:
+                # Check if error is schema-related
+                if 'does not exist' in error.lower() and 'schema' in error.lower():
+                    raise forms.ValidationError({'schema': error})
+                else:
+                    raise forms.ValidationError(f"Connection test failed: {error}")
+            self.connection_verified = True
         
         return cleaned_data
     
@@ -123,6 +161,7 @@ class DatabaseConfigForm(forms.ModelForm):
             self.cleaned_data.pop('password', None)
         
         instance = super().save(commit=False)
+        user_changed = instance.user_id != (self.user.pk if self.user else None)
         instance.user = self.user
         
         # Handle password explicitly
@@ -132,11 +171,24 @@ class DatabaseConfigForm(forms.ModelForm):
             raise forms.ValidationError("Password is required for new databases")
         # If editing and no password provided, password attribute is not set, so existing value is preserved
         
+        tested_fields = []
+        if self.connection_verified:
+            instance.last_tested_at = timezone.now()
+            instance.last_tested_ok = True
+            tested_fields = ['last_tested_at', 'last_tested_ok']
+        
         if commit:
-            # If editing without password change, exclude password from update_fields
-            if not is_new and not password_provided:
-                instance.save(update_fields=[f for f in self.Meta.fields if f != 'password'] + ['user', 'updated_at'])
-            else:
+            if is_new:
                 instance.save()
+            else:
+                # Only write the columns that actually changed; an unchanged password is not re-encrypted
+                update_fields = set(self.changed_data).intersection(self.Meta.fields)
+                if not password_provided:
+                    update_fields.discard('password')
+                if user_changed:
+                    update_fields.add('user')
+                update_fields.update(tested_fields)
+                if update_fields:
+                    instance.save(update_fields=update_fields | {'updated_at'})
         
         return instance
@@ -1,18 +1,107 @@
 """
 Introspect PostgreSQL schemas, tables, columns, and primary keys via information_schema.
 Results are cached briefly to avoid repeated queries; pass refresh=True to bypass cache.
+Cache keys embed version stamps per database and per schema, so invalidating a scope
+only bumps its version and orphans the stale entries (they expire via TTL).
 """
+import re
+import time
+from collections import namedtuple
+from functools import lru_cache
+from itertools import groupby
+
 from django.core.cache import cache
 from django.conf import settings
 
 
+# Schemas managed by PostgreSQL itself; names starting with pg_ are reserved as well
+SYSTEM_SCHEMAS = frozenset({'pg_catalog', 'information_schema', 'pg_toast'})
+
+# Names accepted for new schemas (letters, digits, underscores), matching CreateSchemaForm
+_SCHEMA_NAME_RE = re.compile(r'\w+')
+
+# Column metadata record; column_default is the PostgreSQL default expression (e.g. nextval(...)),
+# is_identity is True for GENERATED ... AS IDENTITY columns (which have no column_default)
+Column = namedtuple("Column", "name data_type is_nullable column_default is_identity", defaults=(False,))
+
+# Everything the table views need about one table
+TableMeta = namedtuple("TableMeta", "columns pk_columns pk_sequence_columns")
+
+
 def _cache_key(prefix: str, *parts: str) -> str:
     return ":".join([prefix] + list(parts))
 
 
+# information_schema.data_type values of the character types
+TEXT_TYPES = frozenset({"text", "character varying", "character"})
+
+
+@lru_cache(maxsize=128)
+def normalize_type(data_type: str) -> str:
+    """Return an information_schema data_type stripped and lowercased, for type lookups."""
+    return data_type.strip().lower()
+
+
+@lru_cache(maxsize=1024)
+def quote_identifier(name: str) -> str:
+    """Quote a PostgreSQL identifier, doubling embedded double quotes."""
+    return '"%s"' % name.replace('"', '""')
+
+
+def _version_key(db_alias: str = None, schema_name: str = None) -> str:
+    return _cache_key("editor", "ver", db_alias or "*", schema_name or "*")
+
+
+def _key_versions(db_alias: str, schema_name: str = None) -> list[str]:
+    """
+    Return the global, database (and optionally schema) cache versions, in that order.
+    Missing versions start at the current time so an evicted counter never reuses old keys.
+    """
+    keys = [_version_key(), _version_key(db_alias)]
+    if schema_name is not None:
+        keys.append(_version_key(db_alias, schema_name))
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [str(versions[key]) for key in keys]
+
+
+def _key_prefix(db_alias: str, schema_name: str = None) -> str:
+    """Return the versioned key prefix for entries of a database (and optionally a schema)."""
+    return "editor:v" + ".".join(_key_versions(db_alias, schema_name))
+
+
+def _key_prefixes(db_alias: str, schema_name: str) -> tuple[str, str]:
+    """Return (database prefix, schema prefix) from a single read of the version counters."""
+    versions = _key_versions(db_alias, schema_name)
+    return "editor:v" + ".".join(versions[:2]), "editor:v" + ".".join(versions)
+
+
+def _bump_version(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+# Seconds during which further refresh requests for the same scope read the cache instead
+REFRESH_DEBOUNCE_SECONDS = 5
+
+
+def _claim_refresh(*scope: str) -> bool:
+    """
+    Return True if the caller may re-query the catalog for scope. Only the first refresh
+    in each REFRESH_DEBOUNCE_SECONDS window wins (cache.add is atomic, also across
+    workers with a shared cache); the others are served from the cache as it stands.
+    """
+    return cache.add(_cache_key("editor", "refresh", *scope), True, timeout=REFRESH_DEBOUNCE_SECONDS)
+
+
 def get_schemas(db_alias: str, refresh: bool = False) -> list[str]:
     """Return list of schema names in the database (excluding pg_* and information_schema)."""
-    key = _cache_key("editor", "schemas", db_alias)
+    key = _cache_key(_key_prefix(db_alias), "schemas", db_alias)
     if not refresh:
         cached = cache.get(key)
         if cached is not None:
@@ -32,9 +121,51 @@ def get_schemas(db_alias: str, refresh: bool = False) -> list[str]:
     return names
 
 
+def get_schemas_with_table_flags(db_alias: str, refresh: bool = False) -> list[dict]:
+    """
+    Return [{"name": ..., "has_tables": ...}] for the schemas get_schemas() lists, with
+    whether each holds a base table, in one query instead of one get_tables() per schema.
+    """
+    prefix = _key_prefix(db_alias)
+    key = _cache_key(prefix, "schema_flags", db_alias)
+    if refresh:
+        refresh = _claim_refresh("schema_flags", db_alias)
+    if not refresh:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    from django.db import connections
+    conn = connections[db_alias]
+    with conn.cursor() as cur:
+        # relkind r/p are what information_schema.tables reports as BASE TABLE, and the
+        # privilege check is its visibility rule, so the flag agrees with get_tables()
+        cur.execute("""
+            SELECT s.schema_name, EXISTS (
+                SELECT 1 FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = s.schema_name AND c.relkind IN ('r', 'p')
+                AND (
+                    pg_has_role(c.relowner, 'USAGE')
+                    OR has_table_privilege(c.oid, 'SELECT, INSERT, UPDATE, DELETE, TRUNCATE, REFERENCES, TRIGGER')
+                    OR has_any_column_privilege(c.oid, 'SELECT, INSERT, UPDATE, REFERENCES')
+                )
+            )
+            FROM information_schema.schemata s
+            WHERE s.schema_name NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
+            AND s.schema_name NOT LIKE 'pg_%'
+            ORDER BY s.schema_name
+        """)
+        info = [{"name": row[0], "has_tables": row[1]} for row in cur.fetchall()]
+    cache.set_many(
+        {key: info, _cache_key(prefix, "schemas", db_alias): [i["name"] for i in info]},
+        timeout=getattr(settings, "INTROSPECTION_CACHE_TIMEOUT", 60),
+    )
+    return info
+
+
 def get_tables(db_alias: str, schema_name: str, refresh: bool = False) -> list[str]:
     """Return list of table names in the given schema (only base tables)."""
-    key = _cache_key("editor", "tables", db_alias, schema_name)
+    key = _cache_key(_key_prefix(db_alias, schema_name), "tables", db_alias, schema_name)
     if not refresh:
         cached = cache.get(key)
         if cached is not None:
@@ -54,12 +185,12 @@ def get_tables(db_alias: str, schema_name: str, refresh: bool = False) -> list[s
     return names
 
 
-def get_columns(db_alias: str, schema_name: str, table_name: str, refresh: bool = False) -> list[dict]:
+def get_columns(db_alias: str, schema_name: str, table_name: str, refresh: bool = False) -> list[Column]:
     """
-    Return list of column info dicts: name, data_type, is_nullable, column_default.
+    Return list of Column records: name, data_type, is_nullable, column_default.
     column_default is the PostgreSQL default expression (e.g. nextval(...) for serial).
     """
-    key = _cache_key("editor", "columns", db_alias, schema_name, table_name)
+    key = _cache_key(_key_prefix(db_alias, schema_name), "columns", db_alias, schema_name, table_name)
     if not refresh:
         cached = cache.get(key)
         if cached is not None:
@@ -68,45 +199,36 @@ def get_columns(db_alias: str, schema_name: str, table_name: str, refresh: bool
     conn = connections[db_alias]
     with conn.cursor() as cur:
         cur.execute("""
-            SELECT column_name, data_type, is_nullable, column_default
+            SELECT column_name, data_type, is_nullable, column_default, is_identity
             FROM information_schema.columns
             WHERE table_schema = %s AND table_name = %s
             ORDER BY ordinal_position
         """, [schema_name, table_name])
-        columns = [
-            {
-                "name": row[0],
-                "data_type": row[1],
-                "is_nullable": row[2] == "YES",
-                "column_default": row[3],
-            }
-            for row in cur.fetchall()
-        ]
+        columns = [Column(r[0], r[1], r[2] == "YES", r[3], r[4] == "YES") for r in cur.fetchall()]
     cache.set(key, columns, timeout=getattr(settings, "INTROSPECTION_CACHE_TIMEOUT", 60))
     return columns
 
 
 def get_pk_sequence_columns(db_alias: str, schema_name: str, table_name: str, refresh: bool = False) -> list[str]:
     """
-    Return list of primary key column names that use a sequence (nextval) as default.
-    Used to omit these columns on INSERT so PostgreSQL fills them automatically.
+    Return list of primary key column names filled by a sequence: a nextval() default
+    or an identity column. Used to omit these columns on INSERT so PostgreSQL fills them automatically.
     """
-    columns = get_columns(db_alias, schema_name, table_name, refresh=refresh)
-    pk_columns = get_primary_key_columns(db_alias, schema_name, table_name, refresh=refresh)
+    columns, pk_columns = get_table_meta(db_alias, schema_name, table_name, refresh=refresh)
+    return _pk_sequence_columns(columns, pk_columns)
+
+
+def _pk_sequence_columns(columns: list[Column], pk_columns: list[str]) -> list[str]:
     pk_set = set(pk_columns)
-    result = []
-    for c in columns:
-        if c["name"] not in pk_set:
-            continue
-        default = (c.get("column_default") or "").strip().lower()
-        if "nextval" in default:
-            result.append(c["name"])
-    return result
+    return [
+        c.name for c in columns
+        if c.name in pk_set and (c.is_identity or "nextval" in (c.column_default or "").lower())
+    ]
 
 
 def get_primary_key_columns(db_alias: str, schema_name: str, table_name: str, refresh: bool = False) -> list[str]:
     """Return ordered list of column names that form the primary key."""
-    key = _cache_key("editor", "pk", db_alias, schema_name, table_name)
+    key = _cache_key(_key_prefix(db_alias, schema_name), "pk", db_alias, schema_name, table_name)
     if not refresh:
         cached = cache.get(key)
         if cached is not None:
@@ -130,18 +252,208 @@ def get_primary_key_columns(db_alias: str, schema_name: str, table_name: str, re
     return names
 
 
-def get_table_meta(db_alias: str, schema_name: str, table_name: str, refresh: bool = False) -> tuple[list[dict], list[str]]:
-    """Return (columns, pk_columns). Convenience to get both in one go."""
-    columns = get_columns(db_alias, schema_name, table_name, refresh=refresh)
-    pk_columns = get_primary_key_columns(db_alias, schema_name, table_name, refresh=refresh)
+def get_table_meta(db_alias: str, schema_name: str, table_name: str, refresh: bool = False) -> tuple[list[Column], list[str]]:
+    """
+    Return (columns, pk_columns). Both are loaded with a single query on a cache miss,
+    which also fills the separate columns and pk cache entries.
+    """
+    prefix = _key_prefix(db_alias, schema_name)
+    key = _cache_key(prefix, "meta", db_alias, schema_name, table_name)
+    columns_key = _cache_key(prefix, "columns", db_alias, schema_name, table_name)
+    pk_key = _cache_key(prefix, "pk", db_alias, schema_name, table_name)
+    if not refresh:
+        # One cache round-trip; fall back to entries filled by get_columns/get_primary_key_columns
+        cached = cache.get_many([key, columns_key, pk_key])
+        if key in cached:
+            return cached[key]
+        if columns_key in cached and pk_key in cached:
+            return cached[columns_key], cached[pk_key]
+    columns, pk_columns = _fetch_table_meta(db_alias, schema_name, table_name)
+    return _store_table_meta(prefix, db_alias, schema_name, table_name, columns, pk_columns)
+
+
+def _store_table_meta(prefix, db_alias, schema_name, table_name, columns, pk_columns):
+    """Cache (columns, pk_columns) under the meta, columns and pk keys and return it."""
+    meta = (columns, pk_columns)
+    cache.set_many(
+        {
+            _cache_key(prefix, "meta", db_alias, schema_name, table_name): meta,
+            _cache_key(prefix, "columns", db_alias, schema_name, table_name): columns,
+            _cache_key(prefix, "pk", db_alias, schema_name, table_name): pk_columns,
+        },
+        timeout=getattr(settings, "INTROSPECTION_CACHE_TIMEOUT", 60),
+    )
+    return meta
+
+
+def get_table_info(db_alias: str, schema_name: str, table_name: str, refresh: bool = False) -> TableMeta:
+    """
+    Check that the schema and base table exist and return the table's TableMeta.
+    The validated result is cached; on a miss the cached schema list, table list and
+    metadata are read in one round-trip and only missing pieces are loaded. Repeated
+    refresh requests are debounced (see _claim_refresh).
+    Raises LookupError("schema") or LookupError("table") for an unknown name.
+    """
+    if refresh:
+        refresh = _claim_refresh("info", db_alias, schema_name, table_name)
+    db_prefix, schema_prefix = _key_prefixes(db_alias, schema_name)
+    info_key = _cache_key(schema_prefix, "info", db_alias, schema_name, table_name)
+    schemas_key = _cache_key(db_prefix, "schemas", db_alias)
+    tables_key = _cache_key(schema_prefix, "tables", db_alias, schema_name)
+    meta_key = _cache_key(schema_prefix, "meta", db_alias, schema_name, table_name)
+    cached = {} if refresh else cache.get_many([info_key, schemas_key, tables_key, meta_key])
+    if info_key in cached:
+        return cached[info_key]
+    timeout = getattr(settings, "INTROSPECTION_CACHE_TIMEOUT", 60)
+    if meta_key not in cached and not (schemas_key in cached and tables_key in cached) and not _is_system_schema(schema_name):
+        # Cold cache: one query both confirms a base table exists and loads its metadata,
+        # instead of listing schemas and tables first
+        columns, pk_columns = _fetch_table_meta(db_alias, schema_name, table_name, base_table_only=True)
+        if columns:
+            _store_table_meta(schema_prefix, db_alias, schema_name, table_name, columns, pk_columns)
+            info = TableMeta(columns, pk_columns, _pk_sequence_columns(columns, pk_columns))
+            cache.set(info_key, info, timeout=timeout)
+            return info
+        # Not found: fall through to the lists to report whether the schema or table is unknown
+    schemas = cached.get(schemas_key)
+    if schemas is None:
+        schemas = get_schemas(db_alias, refresh=refresh)
+    if schema_name not in schemas:
+        raise LookupError("schema")
+    tables = cached.get(tables_key)
+    if tables is None:
+        tables = get_tables(db_alias, schema_name, refresh=refresh)
+    if table_name not in tables:
+        raise LookupError("table")
+    meta = cached.get(meta_key)
+    if meta is None:
+        meta = get_table_meta(db_alias, schema_name, table_name, refresh=refresh)
+    columns, pk_columns = meta
+    info = TableMeta(columns, pk_columns, _pk_sequence_columns(columns, pk_columns))
+    cache.set(info_key, info, timeout=timeout)
+    return info
+
+
+def _is_system_schema(schema_name: str) -> bool:
+    return schema_name in SYSTEM_SCHEMAS or schema_name.startswith('pg_')
+
+
+def _fetch_table_meta(db_alias: str, schema_name: str, table_name: str, base_table_only: bool = False) -> tuple[list[Column], list[str]]:
+    """
+    Query columns and primary key membership for one table in one round-trip.
+    With base_table_only, views and other relations return no columns.
+    """
+    base_table_sql = """
+            AND EXISTS (
+                SELECT 1 FROM information_schema.tables t
+                WHERE t.table_schema = c.table_schema AND t.table_name = c.table_name
+                AND t.table_type = 'BASE TABLE'
+            )""" if base_table_only else ""
+    from django.db import connections
+    conn = connections[db_alias]
+    with conn.cursor() as cur:
+        cur.execute("""
+            WITH pk AS (
+                SELECT kcu.column_name, kcu.ordinal_position
+                FROM information_schema.table_constraints tc
+                JOIN information_schema.key_column_usage kcu
+                    ON tc.constraint_name = kcu.constraint_name
+                    AND tc.table_schema = kcu.table_schema
+                    AND tc.table_name = kcu.table_name
+                WHERE tc.table_schema = %s AND tc.table_name = %s
+                AND tc.constraint_type = 'PRIMARY KEY'
+            )
+            SELECT c.column_name, c.data_type, c.is_nullable, c.column_default, c.is_identity, pk.ordinal_position
+            FROM information_schema.columns c
+            LEFT JOIN pk ON pk.column_name = c.column_name
+            WHERE c.table_schema = %s AND c.table_name = %s{base_table_sql}
+            ORDER BY c.ordinal_position
+        """.format(base_table_sql=base_table_sql), [schema_name, table_name, schema_name, table_name])
+        rows = cur.fetchall()
+    columns = [Column(r[0], r[1], r[2] == "YES", r[3], r[4] == "YES") for r in rows]
+    pk_columns = [row[0] for row in sorted((r for r in rows if r[5] is not None), key=lambda r: r[5])]
     return columns, pk_columns
 
 
+def prefetch_schema_metadata(db_alias: str, schema_name: str, refresh: bool = False) -> None:
+    """
+    Load the base table list plus columns and primary keys for every table in a schema
+    with one query and populate the per-schema and per-table cache entries, so later
+    get_tables, get_table_meta and get_table_info calls hit the cache.
+    """
+    prefix = _key_prefix(db_alias, schema_name)
+    marker = _cache_key(prefix, "schema_meta", db_alias, schema_name)
+    if refresh:
+        refresh = _claim_refresh("schema_meta", db_alias, schema_name)
+    if not refresh and cache.get(marker) is not None:
+        return
+    from django.db import connections, transaction
+    conn = connections[db_alias]
+    # Columns across a whole schema can be large; stream them through a server-side cursor.
+    # Inside a transaction it is not WITH HOLD, so rows are produced as they are fetched
+    # instead of being materialized when the DECLARE commits.
+    # Tables are the driving side so a table without columns is still listed.
+    columns_by_table = {}
+    pk_by_table = {}
+    base_tables = []
+    with transaction.atomic(using=db_alias), conn.chunked_cursor() as cur:
+        cur.execute("""
+            WITH pk AS (
+                SELECT kcu.table_name, kcu.column_name, kcu.ordinal_position
+                FROM information_schema.table_constraints tc
+                JOIN information_schema.key_column_usage kcu
+                    ON tc.constraint_name = kcu.constraint_name
+                    AND tc.table_schema = kcu.table_schema
+                    AND tc.table_name = kcu.table_name
+                WHERE tc.table_schema = %s
+                AND tc.constraint_type = 'PRIMARY KEY'
+            )
+            SELECT t.table_name, t.table_type, c.column_name, c.data_type, c.is_nullable,
+                c.column_default, c.is_identity, pk.ordinal_position
+            FROM information_schema.tables t
+            LEFT JOIN information_schema.columns c
+                ON c.table_schema = t.table_schema AND c.table_name = t.table_name
+            LEFT JOIN pk ON pk.table_name = c.table_name AND pk.column_name = c.column_name
+            WHERE t.table_schema = %s
+            ORDER BY t.table_name, c.ordinal_position
+        """, [schema_name, schema_name])
+        for table, rows in groupby(cur, key=lambda r: r[0]):
+            rows = list(rows)
+            if rows[0][1] == 'BASE TABLE':
+                base_tables.append(table)
+            rows = [r for r in rows if r[2] is not None]
+            columns_by_table[table] = [Column(r[2], r[3], r[4] == "YES", r[5], r[6] == "YES") for r in rows]
+            pk_by_table[table] = [r[2] for r in sorted((r for r in rows if r[7] is not None), key=lambda r: r[7])]
+
+    entries = {
+        marker: True,
+        _cache_key(prefix, "tables", db_alias, schema_name): base_tables,
+    }
+    base_table_set = set(base_tables)
+    for table, columns in columns_by_table.items():
+        pk_columns = pk_by_table[table]
+        entries[_cache_key(prefix, "columns", db_alias, schema_name, table)] = columns
+        entries[_cache_key(prefix, "pk", db_alias, schema_name, table)] = pk_columns
+        entries[_cache_key(prefix, "meta", db_alias, schema_name, table)] = (columns, pk_columns)
+        if table in base_table_set and not _is_system_schema(schema_name):
+            # Validated entry read by get_table_info, so opening any table needs no query
+            entries[_cache_key(prefix, "info", db_alias, schema_name, table)] = TableMeta(
+                columns, pk_columns, _pk_sequence_columns(columns, pk_columns)
+            )
+    cache.set_many(entries, timeout=getattr(settings, "INTROSPECTION_CACHE_TIMEOUT", 60))
+
+
 def invalidate_introspection_cache(db_alias: str = None, schema_name: str = None, table_name: str = None):
-    """Invalidate cached introspection for the given scope. None means all for that level."""
-    # LocMemCache doesn't support delete by pattern; we just document that Refresh clears by re-fetching with refresh=True.
-    # So we don't need to implement pattern delete; views will pass refresh=True when user clicks Refresh.
-    pass
+    """
+    Invalidate cached introspection for the given scope. None means all for that level.
+    Table-level entries share their schema's version, so table_name invalidates the schema.
+    """
+    if db_alias is None:
+        _bump_version(_version_key())
+    elif schema_name is None:
+        _bump_version(_version_key(db_alias))
+    else:
+        _bump_version(_version_key(db_alias, schema_name))
 
 
 def create_schema(db_alias: str, schema_name: str) -> tuple[bool, str]:
@@ -162,9 +474,10 @@ def create_schema(db_alias: str, schema_name: str) -> tuple[bool, str]:
     schema_name = schema_name.strip()
     
     # Prevent creating system schemas
-    system_schemas = {'pg_catalog', 'information_schema', 'pg_toast'}
-    if schema_name.lower() in system_schemas or schema_name.lower().startswith('pg_'):
+    if schema_name.lower() in SYSTEM_SCHEMAS or schema_name.lower().startswith('pg_'):
         return False, f"Cannot create system schema '{schema_name}'"
+    if not _SCHEMA_NAME_RE.fullmatch(schema_name):
+        return False, "Schema name can only contain letters, numbers, and underscores"
     
     from django.db import connections
     from django.db.utils import OperationalError, ProgrammingError
@@ -173,9 +486,9 @@ def create_schema(db_alias: str, schema_name: str) -> tuple[bool, str]:
         conn = connections[db_alias]
         with conn.cursor() as cur:
             # Use IF NOT EXISTS to avoid errors if schema already exists
-            cur.execute(f'CREATE SCHEMA IF NOT EXISTS {conn.ops.quote_name(schema_name)}')
+            cur.execute(f'CREATE SCHEMA IF NOT EXISTS {quote_identifier(schema_name)}')
         # Invalidate schema cache
-        cache.delete(_cache_key("editor", "schemas", db_alias))
+        invalidate_introspection_cache(db_alias)
         return True, None
     except (OperationalError, ProgrammingError) as e:
         return False, str(e)
@@ -202,8 +515,7 @@ def delete_schema(db_alias: str, schema_name: str, force: bool = False) -> tuple
     schema_name = schema_name.strip()
     
     # Prevent deleting system schemas
-    system_schemas = {'pg_catalog', 'information_schema', 'pg_toast'}
-    if schema_name.lower() in system_schemas or schema_name.lower().startswith('pg_'):
+    if schema_name.lower() in SYSTEM_SCHEMAS or schema_name.lower().startswith('pg_'):
         return False, f"Cannot delete system schema '{schema_name}'"
     
     from django.db import connections
@@ -219,17 +531,12 @@ def delete_schema(db_alias: str, schema_name: str, force: bool = False) -> tuple
         
         with conn.cursor() as cur:
             if force:
-                cur.execute(f'DROP SCHEMA IF EXISTS {conn.ops.quote_name(schema_name)} CASCADE')
+                cur.execute(f'DROP SCHEMA IF EXISTS {quote_identifier(schema_name)} CASCADE')
             else:
-                cur.execute(f'DROP SCHEMA IF EXISTS {conn.ops.quote_name(schema_name)}')
+                cur.execute(f'DROP SCHEMA IF EXISTS {quote_identifier(schema_name)}')
         
-        # Invalidate caches
-        cache.delete(_cache_key("editor", "schemas", db_alias))
-        # Also invalidate table caches for this schema
-        for table in tables:
-            cache.delete(_cache_key("editor", "tables", db_alias, schema_name))
-            cache.delete(_cache_key("editor", "columns", db_alias, schema_name, table))
-            cache.delete(_cache_key("editor", "pk", db_alias, schema_name, table))
+        # Invalidate caches for the database, including every entry under this schema
+        invalidate_introspection_cache(db_alias)
         
         return True, None
     except (OperationalError, ProgrammingError) as e:
@@ -239,6 +546,13 @@ def delete_schema(db_alias: str, schema_name: str, force: bool = False) -> tuple
 
 
 def schema_has_tables(db_alias: str, schema_name: str) -> bool:
-    """Check if a schema contains any tables."""
-    tables = get_tables(db_alias, schema_name, refresh=True)
-    return len(tables) > 0
+    """Check if a schema contains any tables (always queried, not cached)."""
+    from django.db import connections
+    with connections[db_alias].cursor() as cur:
+        cur.execute("""
+            SELECT EXISTS (
+                SELECT 1 FROM information_schema.tables
+                WHERE table_schema = %s AND table_type = 'BASE TABLE'
+            )
+        """, [schema_name])
+        return cur.fetchone()[0]
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.utils import DatabaseError
+
+from editor.db_manager import ensure_database_connection
+from editor.introspection import TEXT_TYPES, get_table_info, normalize_type, quote_identifier
+from editor.models import DatabaseConfig
+
+# PostgreSQL truncates identifiers longer than this
+MAX_IDENTIFIER_LENGTH = 63
+
+
+class Command(BaseCommand):
+    help = (
+        "Create pg_trgm GIN indexes so the grid's substring filters (ILIKE '%term%') "
+        "on the given columns can use an index instead of scanning the table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("db_alias", help="Alias of a saved database connection.")
+        parser.add_argument("schema", help="Schema of the table.")
+        parser.add_argument("table", help="Table to index.")
+        parser.add_argument("columns", nargs="+", help="Columns to index.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print the statements instead of running them.",
+        )
+
+    def handle(self, *args, **options):
+        db_alias = options["db_alias"]
+        schema_name = options["schema"]
+        table_name = options["table"]
+        try:
+            ensure_database_connection(db_alias)
+        except DatabaseConfig.DoesNotExist:
+            raise CommandError(f"Unknown database alias '{db_alias}'.")
+        try:
+            columns, _, _ = get_table_info(db_alias, schema_name, table_name, refresh=True)
+        except LookupError as e:
+            raise CommandError(f"Unknown {e.args[0]}.")
+        column_by_name = {c.name: c for c in columns}
+        unknown = [c for c in options["columns"] if c not in column_by_name]
+        if unknown:
+            raise CommandError(f"Unknown column(s): {', '.join(unknown)}.")
+
+        statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+        for name in options["columns"]:
+            data_type = normalize_type(column_by_name[name].data_type or "")
+            # Index the same expression the grid filters on: the column itself for
+            # text types (filtered without a cast), otherwise its ::text cast
+            if data_type in TEXT_TYPES:
+                expression = quote_identifier(name)
+            else:
+                expression = f"({quote_identifier(name)}::text)"
+            index_name = f"{table_name}_{name}_trgm_idx"[:MAX_IDENTIFIER_LENGTH]
+            statements.append(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {quote_identifier(index_name)} "
+                f"ON {quote_identifier(schema_name)}.{quote_identifier(table_name)} "
+                f"USING gin ({expression} gin_trgm_ops)"
+            )
+
+        if options["dry_run"]:
+            for sql in statements:
+                self.stdout.write(f"{sql};")
+            return
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction; the connection
+        # is in autocommit mode here
+        with connections[db_alias].cursor() as cur:
+            for sql in statements:
+                self.stdout.write(f"{sql};")
+                try:
+                    cur.execute(sql)
+                except DatabaseError as e:
+                    raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS("Trigram indexes are in place."))
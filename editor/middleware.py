@@ -0,0 +1,60 @@
+"""
+Host validation for ALLOWED_HOSTS_IP_RANGES.
+"""
+import ipaddress
+
+from django.conf import settings
+from django.core.exceptions import DisallowedHost, MiddlewareNotUsed
+from django.http.request import split_domain_port, validate_host
+
+
+class AllowedHostNetworksMiddleware:
+    """
+    Accept a request whose host is in ALLOWED_HOST_NAMES or is an IP address inside
+    one of ALLOWED_HOST_NETWORKS. It is only active when ranges are configured (settings
+    then set ALLOWED_HOSTS to "*"), so a /16 costs a few network checks per request
+    instead of a scan over 65k expanded addresses.
+    """
+
+    def __init__(self, get_response):
+        self.networks = getattr(settings, "ALLOWED_HOST_NETWORKS", ())
+        if not self.networks:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.host_names = settings.ALLOWED_HOST_NAMES
+        if settings.DEBUG and not self.host_names:
+            # Same localhost fallback Django applies to an empty ALLOWED_HOSTS
+            self.host_names = [".localhost", "127.0.0.1", "[::1]"]
+
+    def __call__(self, request):
+        # With ALLOWED_HOSTS = ["*"] this only rejects malformed hosts
+        host = request.get_host()
+        domain, _ = split_domain_port(host)
+        if not (validate_host(domain, self.host_names) or self._in_networks(domain)):
+            raise DisallowedHost(
+                f"Invalid HTTP_HOST header: {host!r}. You may need to add {domain!r} "
+                "to ALLOWED_HOSTS or ALLOWED_HOSTS_IP_RANGES."
+            )
+        return self.get_response(request)
+
+    def _in_networks(self, domain):
+        try:
+            ip = ipaddress.ip_address(domain.strip("[]"))
+        except ValueError:
+            return False
+        return any(_is_host_address(ip, network) for network in self.networks)
+
+
+def _is_host_address(ip, network):
+    """
+    True if ip is one of network.hosts(), the addresses the range used to expand to:
+    the network address (and for IPv4 the broadcast address) is excluded unless the
+    network has at most two addresses (/31, /32, /127, /128).
+    """
+    if ip not in network:
+        return False
+    if network.num_addresses <= 2:
+        return True
+    if ip == network.network_address:
+        return False
+    return network.version == 6 or ip != network.broadcast_address
@@ -1,6 +1,22 @@
 # Generated manually - add schema field to DatabaseConfig model
 
 from django.db import migrations, models
+from django.db.models import Max
+
+# Rows updated per statement; keeps each UPDATE a short, bounded primary key range scan
+BATCH_SIZE = 30_000
+
+
+def set_default_schema(apps, schema_editor):
+    """Set 'public' as schema for existing records, one primary key range at a time."""
+    DatabaseConfig = apps.get_model('editor', 'DatabaseConfig')
+    max_pk = DatabaseConfig.objects.aggregate(Max('pk'))['pk__max']
+    if max_pk is None:
+        return
+    for start in range(0, max_pk + 1, BATCH_SIZE):
+        DatabaseConfig.objects.filter(
+            pk__gte=start, pk__lt=start + BATCH_SIZE, schema__isnull=True,
+        ).update(schema='public')
 
 
 class Migration(migrations.Migration):
@@ -17,10 +33,7 @@ class Migration(migrations.Migration):
             field=models.CharField(help_text='Schema name within the database', max_length=255, null=True, blank=True),
         ),
         # Data migration: set 'public' as default for existing records
-        migrations.RunPython(
-            lambda apps, schema_editor: apps.get_model('editor', 'DatabaseConfig').objects.filter(schema__isnull=True).update(schema='public'),
-            reverse_code=migrations.RunPython.noop,
-        ),
+        migrations.RunPython(set_default_schema, reverse_code=migrations.RunPython.noop),
         # Make schema field non-nullable
         migrations.AlterField(
             model_name='databaseconfig',
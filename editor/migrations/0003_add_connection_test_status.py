@@ -0,0 +1,23 @@
+# Generated manually - record the outcome of the last connection test on DatabaseConfig
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('editor', '0002_add_schema_to_database_config'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='databaseconfig',
+            name='last_tested_at',
+            field=models.DateTimeField(blank=True, help_text='When the connection was last tested', null=True),
+        ),
+        migrations.AddField(
+            model_name='databaseconfig',
+            name='last_tested_ok',
+            field=models.BooleanField(blank=True, help_text='Result of the last connection test', null=True),
+        ),
+    ]
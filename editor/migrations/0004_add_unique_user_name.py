@@ -0,0 +1,50 @@
+# Generated manually - enforce unique display name per user at the database level
+
+from django.db import migrations, models
+from django.db.models import Count
+
+NAME_MAX_LENGTH = 255
+
+
+def deduplicate_names(apps, schema_editor):
+    """
+    Rename configs whose (user, name) is taken by an older config, so the constraint can
+    be added on installs created before names were unique. The oldest config keeps its
+    name; the others get a " (2)", " (3)", ... suffix that is free for that user.
+    """
+    DatabaseConfig = apps.get_model('editor', 'DatabaseConfig')
+    duplicates = (
+        DatabaseConfig.objects.values('user_id', 'name')
+        .annotate(n=Count('pk'))
+        .filter(n__gt=1)
+    )
+    for dup in duplicates:
+        user_id, name = dup['user_id'], dup['name']
+        taken = set(DatabaseConfig.objects.filter(user_id=user_id).values_list('name', flat=True))
+        configs = DatabaseConfig.objects.filter(user_id=user_id, name=name).order_by('pk')
+        suffix = 2
+        for config in configs[1:]:
+            while True:
+                tag = f" ({suffix})"
+                candidate = name[:NAME_MAX_LENGTH - len(tag)] + tag
+                suffix += 1
+                if candidate not in taken:
+                    break
+            taken.add(candidate)
+            DatabaseConfig.objects.filter(pk=config.pk).update(name=candidate)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('editor', '0003_add_connection_test_status'),
+    ]
+
+    operations = [
+        # Data migration: existing duplicate names would make AddConstraint fail
+        migrations.RunPython(deduplicate_names, reverse_code=migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='databaseconfig',
+            constraint=models.UniqueConstraint(fields=['user', 'name'], name='unique_user_name'),
+        ),
+    ]
@@ -1,9 +1,34 @@
 from django.db import models
+from django.db.models.query_utils import DeferredAttribute
 from django.contrib.auth.models import User
 from django.conf import settings
-from cryptography.fernet import Fernet
 import base64
+import functools
 import hashlib
+import os
+import uuid
+
+
+# libpq parameters for every connection to a user database. TCP keepalives make a
+# dropped peer surface in about 4 minutes instead of the OS default of ~2 hours;
+# tcp_user_timeout (PostgreSQL 12+) can be added here the same way.
+LIBPQ_CONNECTION_OPTIONS = {
+    'connect_timeout': 10,
+    'keepalives': 1,
+    'keepalives_idle': 240,
+    'keepalives_interval': 10,
+    'keepalives_count': 5,
+    'application_name': 'local-db-editor',
+}
+
+# Instance-independent part of DatabaseConfig.get_connection_config()
+_CONNECTION_CONFIG_TEMPLATE = {
+    'ENGINE': 'django.db.backends.postgresql',
+    # Required Django database settings
+    'ATOMIC_REQUESTS': False,  # Required by Django's connection handler
+    'AUTOCOMMIT': True,  # Standard PostgreSQL behavior
+    'CONN_HEALTH_CHECKS': True,  # Verify persistent connections before reuse (Django 4.2+)
+}
 
 
 def _get_encryption_key():
@@ -14,32 +39,103 @@ def _get_encryption_key():
     return base64.urlsafe_b64encode(key)
 
 
+# Values written by _encrypt() carry this prefix; anything else is a legacy Fernet token
+_AESGCM_PREFIX = 'gcm1$'
+_AESGCM_NONCE_SIZE = 12
+
+
+@functools.lru_cache(maxsize=1)
+def _get_cipher():
+    """Return the process-wide Fernet cipher used to read legacy values."""
+    # Imported here so startup and management commands don't load the OpenSSL bindings
+    from cryptography.fernet import Fernet
+    return Fernet(_get_encryption_key())
+
+
+@functools.lru_cache(maxsize=1)
+def _get_aead():
+    """Return the process-wide AES-256-GCM cipher, deriving its own key from SECRET_KEY."""
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    key = hashlib.sha256(settings.SECRET_KEY.encode('utf-8') + b':aes-gcm').digest()
+    return AESGCM(key)
+
+
+def _encrypt(value):
+    nonce = os.urandom(_AESGCM_NONCE_SIZE)
+    token = _get_aead().encrypt(nonce, value.encode(), None)
+    return _AESGCM_PREFIX + base64.urlsafe_b64encode(nonce + token).decode()
+
+
+class _Ciphertext(str):
+    """Encrypted value as loaded from the database, not yet decrypted."""
+    __slots__ = ()
+
+
+def _decrypt(value):
+    try:
+        if value.startswith(_AESGCM_PREFIX):
+            raw = base64.urlsafe_b64decode(value[len(_AESGCM_PREFIX):])
+            nonce, token = raw[:_AESGCM_NONCE_SIZE], raw[_AESGCM_NONCE_SIZE:]
+            return _get_aead().decrypt(nonce, token, None).decode()
+        # Written before the switch to AES-GCM; re-encrypted on the next password save
+        return _get_cipher().decrypt(value.encode()).decode()
+    except Exception:
+        # If decryption fails, return as-is (for migration compatibility)
+        return str(value)
+
+
+class _EncryptedAttribute(DeferredAttribute):
+    """Decrypt the loaded ciphertext on first attribute access and keep the plaintext."""
+    
+    def __get__(self, instance, cls=None):
+        value = super().__get__(instance, cls)
+        if instance is not None and type(value) is _Ciphertext:
+            value = _decrypt(value)
+            instance.__dict__[self.field.attname] = value
+        return value
+    
+    def __set__(self, instance, value):
+        # Defining __set__ makes this a data descriptor, so __get__ runs even though
+        # the value lives in the instance __dict__
+        instance.__dict__[self.field.attname] = value
+
+
 class EncryptedCharField(models.CharField):
-    """A CharField that encrypts values before storing and decrypts when reading."""
+    """
+    A CharField that encrypts values before storing and decrypts when reading.
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._cipher = Fernet(_get_encryption_key())
+    New values use AES-256-GCM; existing Fernet values are still read. Decryption
+    is lazy: rows loaded for list pages never pay for it unless the attribute is read. values()/values_list() return the ciphertext.
+    """
+    descriptor_class = _EncryptedAttribute
     
     def from_db_value(self, value, expression, connection):
-        """Decrypt value when reading from database."""
+        """Keep the ciphertext; the attribute descriptor decrypts it on first access."""
         if value is None:
             return value
-        try:
-            return self._cipher.decrypt(value.encode()).decode()
-        except Exception:
-            # If decryption fails, return as-is (for migration compatibility)
-            return value
+        return _Ciphertext(value)
     
     def to_python(self, value):
-        """Return value as-is (already decrypted by from_db_value)."""
+        """Return value as-is (decrypted on attribute access)."""
         return value
     
+    def pre_save(self, model_instance, add):
+        """Read the raw value so an untouched password is written back without re-encrypting."""
+        return model_instance.__dict__.get(self.attname)
+    
     def get_prep_value(self, value):
         """Encrypt value before storing in database."""
         if value is None:
             return value
-        return self._cipher.encrypt(value.encode()).decode()
+        if type(value) is _Ciphertext:
+            return str(value)
+        return _encrypt(value)
+
+
+class DatabaseConfigManager(models.Manager):
+    def list_for_user(self, user):
+        """Return the user's configs for display, without loading the encrypted password."""
+        return self.filter(user=user).defer('password')
 
 
 class DatabaseConfig(models.Model):
@@ -53,15 +149,24 @@ class DatabaseConfig(models.Model):
     schema = models.CharField(max_length=255, help_text="Schema name within the database")
     username = models.CharField(max_length=255)
     password = EncryptedCharField(max_length=500)
+    last_tested_at = models.DateTimeField(null=True, blank=True, help_text="When the connection was last tested")
+    last_tested_ok = models.BooleanField(null=True, blank=True, help_text="Result of the last connection test")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = DatabaseConfigManager()
+    
     class Meta:
         unique_together = [['user', 'alias']]
         ordering = ['name']
-        # Ensure unique database+schema combination per user
+        # Ensure unique database+schema combination per user. No include= (covering
+        # columns): the app database is SQLite, where Django skips creating such a
+        # constraint entirely (models.W039) and uniqueness would be lost.
         constraints = [
-            models.UniqueConstraint(fields=['user', 'database', 'schema'], name='unique_user_database_schema')
+            models.UniqueConstraint(fields=['user', 'database', 'schema'], name='unique_user_database_schema'),
+            # Its (user, name) index also serves filter(user=...) with the default name ordering,
+            # so list views scan the index in order without a separate sort
+            models.UniqueConstraint(fields=['user', 'name'], name='unique_user_name'),
         ]
     
     def __str__(self):
@@ -74,29 +179,25 @@ class DatabaseConfig(models.Model):
                 # If pk exists but alias doesn't, generate from pk
                 self.alias = f"user_{self.user_id}_db_{self.pk}"
             else:
-                # For new objects, save first to get pk, then update alias
-                super().save(*args, **kwargs)
-                if not self.alias:
-                    self.alias = f"user_{self.user_id}_db_{self.pk}"
-                    super().save(update_fields=['alias'])
-                return
+                # For new objects, use a random suffix so the row is created with a single INSERT
+                self.alias = f"user_{self.user_id}_db_{uuid.uuid4().hex[:12]}"
         super().save(*args, **kwargs)
     
+    def get_connection_state(self):
+        """Return the connection fields with the password still encrypted, for change detection."""
+        return (self.host, self.port, self.database, self.username, str(self.__dict__.get('password')))
+
     def get_connection_config(self):
         """Return Django database connection config dict with all required Django settings."""
-        from django.conf import settings
-        return {
-            'ENGINE': 'django.db.backends.postgresql',
-            'NAME': self.database,
-            'USER': self.username,
-            'PASSWORD': self.password,  # Already decrypted by EncryptedCharField
-            'HOST': self.host,
-            'PORT': str(self.port),
-            'OPTIONS': {'connect_timeout': 10},
-            # Required Django database settings
-            'ATOMIC_REQUESTS': False,  # Required by Django's connection handler
-            'TIME_ZONE': getattr(settings, 'TIME_ZONE', None),  # Use Django's TIME_ZONE setting
-            'AUTOCOMMIT': True,  # Standard PostgreSQL behavior
-            'CONN_HEALTH_CHECKS': False,  # Connection health checks (Django 4.2+)
-            'CONN_MAX_AGE': 0,  # Connection max age in seconds (0 = close after each request)
-        }
+        config = _CONNECTION_CONFIG_TEMPLATE.copy()
+        config.update(
+            NAME=self.database,
+            USER=self.username,
+            PASSWORD=self.password,  # Decrypted by EncryptedCharField on access
+            HOST=self.host,
+            PORT=str(self.port),
+            OPTIONS=dict(LIBPQ_CONNECTION_OPTIONS),  # Own copy; Django may mutate OPTIONS
+            TIME_ZONE=getattr(settings, 'TIME_ZONE', None),  # Use Django's TIME_ZONE setting
+            CONN_MAX_AGE=getattr(settings, 'USER_DB_CONN_MAX_AGE', 60),  # Keep connections open across requests
+        )
+        return config
@@ -1,5 +1,12 @@
+import re
+
 from django import forms
 
+from .introspection import SYSTEM_SCHEMAS
+
+# Letters, numbers, and underscores
+_NAME_RE = re.compile(r'\w+')
+
 
 class CreateSchemaForm(forms.Form):
     """Form for creating a new schema."""
@@ -18,12 +25,12 @@ class CreateSchemaForm(forms.Form):
             raise forms.ValidationError("Schema name cannot be empty")
         
         # Check for valid PostgreSQL identifier
-        if not name.replace('_', '').isalnum():
+        if not _NAME_RE.fullmatch(name):
             raise forms.ValidationError("Schema name can only contain letters, numbers, and underscores")
         
         # Check for reserved names
-        system_schemas = {'pg_catalog', 'information_schema', 'pg_toast'}
-        if name.lower() in system_schemas or name.lower().startswith('pg_'):
+        name_lower = name.lower()
+        if name_lower in SYSTEM_SCHEMAS or name_lower.startswith('pg_'):
             raise forms.ValidationError(f"Cannot create system schema '{name}'")
         
         return name
@@ -167,6 +167,15 @@
     return input.value;
   }
 
+  function isCellChanged(cell) {
+    var original = cell.getAttribute("data-original") || "";
+    var current = getCellValue(cell);
+    var input = cell.querySelector(".cell-edit");
+    // A NULL boolean renders as an unchecked box; leaving it unchecked is not a change
+    if (input && input.type === "checkbox" && original === "" && current === "false") return false;
+    return original !== current;
+  }
+
   function getRowData(rowEl) {
     var pk = getRowPk(rowEl);
     if (!pk) return null;
@@ -174,6 +183,10 @@
     var columns = {};
     for (var i = 0; i < cells.length; i++) {
       var cell = cells[i];
+      // Truncated cells only hold a display prefix; never write them back
+      if (cell.hasAttribute("data-truncated")) continue;
+      // Send only edited cells so the UPDATE writes just the changed columns
+      if (!isCellChanged(cell)) continue;
       var col = cell.getAttribute("data-column");
       columns[col] = getCellValue(cell);
     }
@@ -283,9 +296,7 @@
       if (cell && !cell.contains(document.activeElement)) {
         hideEdit(cell);
         var row = cell.closest("tr");
-        var original = cell.getAttribute("data-original");
-        var current = getCellValue(cell);
-        if (original !== current) markDirty(row);
+        if (isCellChanged(cell)) markDirty(row);
       }
     }
   });
@@ -336,7 +347,7 @@
     var rows = [];
     dirtyRows.forEach(function (rowEl) {
       var data = getRowData(rowEl);
-      if (data) rows.push(data);
+      if (data && Object.keys(data.columns).length) rows.push(data);
     });
     var body = JSON.stringify({ rows: rows });
     var xhr = new XMLHttpRequest();
@@ -355,6 +366,7 @@
         dirtyRows.forEach(function (rowEl) {
           var cells = rowEl.querySelectorAll("td[data-column]");
           cells.forEach(function (cell) {
+            if (cell.hasAttribute("data-truncated")) return;
             var val = getCellValue(cell);
             cell.setAttribute("data-original", val);
             setCellDisplay(cell, val);
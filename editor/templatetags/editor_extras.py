@@ -1,9 +1,10 @@
-import json
 from datetime import date, datetime, time
-from decimal import Decimal
+import orjson
 from django import template
 from django.utils.safestring import mark_safe
 
+from ..introspection import Column, normalize_type
+
 register = template.Library()
 
 # PostgreSQL information_schema.data_type values that map to HTML input types
@@ -17,78 +18,88 @@ NUMERIC_TYPES = {
 BOOLEAN_TYPES = {"boolean"}
 
 
-def _json_serial(val):
-    """Convert common DB types to JSON-serializable form for data-pk."""
-    if val is None:
-        return None
-    if isinstance(val, (datetime, date, time)):
+def _pk_dumps(pk):
+    """Compact JSON for a {column: value} primary key."""
+    # orjson encodes date/datetime natively and Decimal via default, but rejects a
+    # time with a tzinfo (timetz) instead of calling default, so times are turned
+    # into ISO 8601 strings first
+    return orjson.dumps(
+        {k: v.isoformat() if type(v) is time else v for k, v in pk.items()}, default=str
+    ).decode()
+
+
+def _format_date(val):
+    if isinstance(val, date):
         return val.isoformat()
-    if isinstance(val, Decimal):
-        return str(val)
-    return val
+    if isinstance(val, datetime):
+        return val.date().isoformat()
+    return str(val)[:10] if len(str(val)) >= 10 else str(val)
+
+
+def _format_timestamp(val):
+    if isinstance(val, datetime):
+        # datetime-local expects no timezone; use naive ISO format
+        if val.tzinfo:
+            val = val.astimezone().replace(tzinfo=None)
+        return val.isoformat(" ").replace(" ", "T")[:19]
+    if isinstance(val, date) and not isinstance(val, datetime):
+        return val.isoformat() + "T00:00:00"
+    s = str(val)
+    if " " in s:
+        s = s.replace(" ", "T", 1)[:19]
+    return s
+
+
+def _format_time(val):
+    if isinstance(val, time):
+        return val.isoformat()[:12]  # HH:MM:SS or HH:MM:SS.ffffff
+    return str(val)[:12]
+
+
+def _format_boolean(val):
+    if isinstance(val, bool):
+        return "true" if val else "false"
+    s = str(val).strip().lower()
+    return "true" if s in ("t", "true", "1", "yes", "on") else "false"
+
+
+# Normalized data_type -> (HTML input type, input value formatter)
+_DEFAULT_TYPE_ENTRY = ("text", str)
+_TYPE_TABLE = {
+    data_type: entry
+    for data_types, entry in (
+        (DATE_TYPES, ("date", _format_date)),
+        (TIMESTAMP_TYPES, ("datetime-local", _format_timestamp)),
+        (TIME_TYPES, ("time", _format_time)),
+        (NUMERIC_TYPES, ("number", str)),
+        (BOOLEAN_TYPES, ("checkbox", _format_boolean)),
+    )
+    for data_type in data_types
+}
+_DATETIME_INPUT_TYPES = {"date", "datetime-local", "time"}
+
+
+def _type_entry(data_type):
+    if not data_type:
+        return _DEFAULT_TYPE_ENTRY
+    return _TYPE_TABLE.get(normalize_type(data_type), _DEFAULT_TYPE_ENTRY)
 
 
 def _html_input_type(data_type):
     """Return HTML input type for a PostgreSQL data_type."""
-    if not data_type:
-        return "text"
-    dt = data_type.strip().lower()
-    if dt in DATE_TYPES:
-        return "date"
-    if dt in TIMESTAMP_TYPES:
-        return "datetime-local"
-    if dt in TIME_TYPES:
-        return "time"
-    if dt in NUMERIC_TYPES:
-        return "number"
-    if dt in BOOLEAN_TYPES:
-        return "checkbox"
-    return "text"
+    return _type_entry(data_type)[0]
 
 
 def _is_datetime_column(data_type):
     """Return True if column is date, timestamp, or time (eligible for 'Now' button)."""
-    if not data_type:
-        return False
-    dt = data_type.strip().lower()
-    return dt in DATE_TYPES or dt in TIMESTAMP_TYPES or dt in TIME_TYPES
+    return _type_entry(data_type)[0] in _DATETIME_INPUT_TYPES
 
 
 def _format_input_value(val, data_type):
     """Format a value for use in an HTML input (date → YYYY-MM-DD, etc.)."""
     if val is None or (isinstance(val, str) and val.strip() == ""):
         return ""
-    if not data_type:
-        return str(val)
-    dt = data_type.strip().lower()
-    if dt in DATE_TYPES:
-        if isinstance(val, date):
-            return val.isoformat()
-        if isinstance(val, datetime):
-            return val.date().isoformat()
-        return str(val)[:10] if len(str(val)) >= 10 else str(val)
-    if dt in TIMESTAMP_TYPES:
-        if isinstance(val, datetime):
-            # datetime-local expects no timezone; use naive ISO format
-            if val.tzinfo:
-                val = val.astimezone().replace(tzinfo=None)
-            return val.isoformat(" ").replace(" ", "T")[:19]
-        if isinstance(val, date) and not isinstance(val, datetime):
-            return val.isoformat() + "T00:00:00"
-        s = str(val)
-        if " " in s:
-            s = s.replace(" ", "T", 1)[:19]
-        return s
-    if dt in TIME_TYPES:
-        if isinstance(val, time):
-            return val.isoformat()[:12]  # HH:MM:SS or HH:MM:SS.ffffff
-        return str(val)[:12]
-    if dt in BOOLEAN_TYPES:
-        if isinstance(val, bool):
-            return "true" if val else "false"
-        s = str(val).strip().lower()
-        return "true" if s in ("t", "true", "1", "yes", "on") else "false"
-    return str(val)
+    return _type_entry(data_type)[1](val)
 
 
 @register.filter
@@ -97,35 +108,59 @@ def get_item(d, key):
     if d is None:
         return ""
     val = d.get(key)
-    return "" if val is None else str(val)
+    if val is None:
+        return ""
+    # Most cells are already text; skip the str() call for exact str instances
+    if type(val) is str:
+        return val
+    return str(val)
+
+
+@register.filter
+def cell(row, index):
+    """Get a raw value from a tuple row by position: {{ row|cell:idx }} (None if the column is missing)."""
+    if row is None or index is None:
+        return None
+    return row[index]
+
+
+@register.filter
+def cell_text(row, index):
+    """Display text of a tuple row cell, like get_item for dict rows."""
+    val = cell(row, index)
+    if val is None:
+        return ""
+    if type(val) is str:
+        return val
+    return str(val)
+
+
+@register.filter
+def is_truncated(val):
+    """True for a cell value the view cut short for display (not editable in the grid)."""
+    return getattr(val, "truncated", False) is True
 
 
 @register.filter
 def input_type_for_column(column):
-    """Return HTML input type for a column dict with 'data_type' key."""
-    if not column or not isinstance(column, dict):
+    """Return HTML input type for a Column record."""
+    if not isinstance(column, Column):
         return "text"
-    return _html_input_type(column.get("data_type") or "")
+    return _html_input_type(column.data_type or "")
 
 
 @register.filter
 def is_datetime_column(column):
     """Return True if column is date/timestamp/time (show 'Now' button)."""
-    if not column or not isinstance(column, dict):
+    if not isinstance(column, Column):
         return False
-    return _is_datetime_column(column.get("data_type") or "")
+    return _is_datetime_column(column.data_type or "")
 
 
 @register.filter
-def input_value_for_column(row, column):
-    """Format row value for the column's input (date → YYYY-MM-DD, etc.)."""
-    if not column or not isinstance(column, dict):
-        return ""
-    key = column.get("name")
-    if key is None:
-        return ""
-    val = row.get(key) if row else None
-    return _format_input_value(val, column.get("data_type") or "")
+def input_value(val, data_type):
+    """Format a cell value for an input of the given data_type (date → YYYY-MM-DD, etc.)."""
+    return _format_input_value(val, data_type or "")
 
 
 @register.filter
@@ -137,11 +172,21 @@ def pk_json(row, pk_columns):
     """
     if not row or not pk_columns:
         return "{}"
-    pk = {k: _json_serial(row.get(k)) for k in pk_columns}
-    return json.dumps(pk)
+    return _pk_dumps({k: row.get(k) for k in pk_columns})
+
+
+@register.filter
+def pk_json_pos(row, pk_fields):
+    """Serialize the primary key of a tuple row for the data-pk attribute.
+    
+    pk_fields is a list of (column name, row index) pairs built once by the view.
+    """
+    if not row or not pk_fields:
+        return "{}"
+    return _pk_dumps({name: row[i] for name, i in pk_fields})
 
 
 @register.filter
 def to_json(val):
     """Serialize value to JSON (e.g. for script tag)."""
-    return mark_safe(json.dumps(val))
+    return mark_safe(orjson.dumps(val, option=orjson.OPT_NON_STR_KEYS).decode())
@@ -1,6 +1,15 @@
-from django.urls import path
+from django.urls import include, path
 from . import views
 
+# Row-level endpoints of a single table, mounted under the shared table prefix below
+table_patterns = [
+    path("", views.table_grid, name="table_grid"),
+    path("save/", views.table_save_rows, name="table_save_rows"),
+    path("insert/", views.table_insert_row, name="table_insert_row"),
+    path("delete/", views.table_delete_rows, name="table_delete_rows"),
+    path("export/", views.table_export, name="table_export"),
+]
+
 urlpatterns = [
     path("", views.home_redirect),
     path("databases/", views.database_list, name="database_list"),
@@ -31,22 +40,6 @@ urlpatterns = [
     ),
     path(
         "databases/<str:db_alias>/schemas/<str:schema_name>/tables/<str:table_name>/",
-        views.table_grid,
-        name="table_grid",
-    ),
-    path(
-        "databases/<str:db_alias>/schemas/<str:schema_name>/tables/<str:table_name>/save/",
-        views.table_save_rows,
-        name="table_save_rows",
-    ),
-    path(
-        "databases/<str:db_alias>/schemas/<str:schema_name>/tables/<str:table_name>/insert/",
-        views.table_insert_row,
-        name="table_insert_row",
-    ),
-    path(
-        "databases/<str:db_alias>/schemas/<str:schema_name>/tables/<str:table_name>/delete/",
-        views.table_delete_rows,
-        name="table_delete_rows",
+        include(table_patterns),
     ),
 ]
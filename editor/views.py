@@ -1,90 +1,553 @@
+import base64
+import binascii
+import csv
+import hashlib
+import io
 import json
+from collections import namedtuple
+from datetime import date, time
 from decimal import Decimal
+from functools import lru_cache
+from urllib.parse import urlencode
 from django.shortcuts import redirect, render
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseBadRequest, JsonResponse
+from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
 from django.conf import settings
-from django.core.paginator import Paginator
+from django.core.cache import cache
 from django.urls import reverse
 from django.middleware.csrf import get_token
-from django.db import transaction
+from django.db import connections, transaction
 from django.db.utils import OperationalError, ProgrammingError
 from django.shortcuts import get_object_or_404
 from django.contrib import messages
+import orjson
+from psycopg2.extras import execute_values
 
 from .introspection import (
     get_schemas,
+    get_schemas_with_table_flags,
     get_tables,
     get_columns,
     get_primary_key_columns,
-    get_table_meta,
-    get_pk_sequence_columns,
+    get_table_info,
+    normalize_type,
+    prefetch_schema_metadata,
+    quote_identifier,
+    TEXT_TYPES,
     create_schema,
     delete_schema,
     schema_has_tables,
 )
 from .models import DatabaseConfig
+from .templatetags.editor_extras import input_type_for_column, is_datetime_column
 from .forms import DatabaseConfigForm
 from .schema_forms import CreateSchemaForm
 from .db_manager import (
     ensure_database_connection,
+    close_test_pools,
     remove_database_connection,
     test_database_connection,
     load_user_databases,
+    connection_fingerprint,
+    schedule_connection_test,
 )
 
-_DATE_TYPES = {"date"}
-_TS_TYPES = {"timestamp with time zone", "timestamp without time zone"}
-_TIME_TYPES = {"time with time zone", "time without time zone"}
-_BOOL_TYPES = {"boolean"}
-_INT_TYPES = {"integer", "bigint", "smallint", "serial", "bigserial"}
-_FLOAT_TYPES = {"real", "double precision"}
-_DECIMAL_TYPES = {"numeric", "decimal"}
+_json_loads = orjson.loads
 
 
-def _coerce_value(val, data_type):
-    """Coerce a value for DB write based on PostgreSQL data_type."""
-    if data_type is None:
+def _json_dumps(obj):
+    return orjson.dumps(obj, default=str)
+
+
+def _json_response(data):
+    """JsonResponse equivalent encoded with orjson."""
+    return HttpResponse(_json_dumps(data), content_type="application/json")
+
+
+# Session key holding fingerprints of connections tested successfully via the Test button
+_TESTED_CONNECTIONS_SESSION_KEY = "editor_tested_connections"
+
+_DATE_TYPES = frozenset({"date"})
+_TS_TYPES = frozenset({"timestamp with time zone", "timestamp without time zone"})
+_TIME_TYPES = frozenset({"time with time zone", "time without time zone"})
+_BOOL_TYPES = frozenset({"boolean"})
+_INT_TYPES = frozenset({"integer", "bigint", "smallint", "serial", "bigserial"})
+_FLOAT_TYPES = frozenset({"real", "double precision"})
+_DECIMAL_TYPES = frozenset({"numeric", "decimal"})
+# Column types whose values survive the JSON page cursor and compare in SQL as they sort
+_KEYSET_TYPES = (
+    _INT_TYPES | _FLOAT_TYPES | _DECIMAL_TYPES | _DATE_TYPES | _TS_TYPES | _TIME_TYPES
+    | {"text", "character varying", "character", "uuid"}
+)
+
+
+# Keeps OFFSET ((page - 1) * per_page) well inside bigint
+_MAX_PAGE_NUM = 10 ** 9
+
+
+def _clamped_int(value, default, lo, hi):
+    """Parse a query param as a non-negative int in [lo, hi]; default when missing or not decimal digits."""
+    n = int(value) if value and value.isdecimal() else default
+    return min(max(n, lo), hi)
+
+
+# Tables whose planner estimate (pg_class.reltuples) is at least this large show
+# "~N rows" (the plan's row estimate when filtered) instead of running COUNT(*);
+# smaller ones are counted exactly
+_EXACT_COUNT_THRESHOLD = 10000
+# Seconds to reuse a table's size estimate, or a row count for the same filters
+_FILTERED_COUNT_TIMEOUT = 30
+
+
+def _count_cache_key(kind, *parts):
+    digest = hashlib.blake2b(_json_dumps(parts), digest_size=16).hexdigest()
+    return f"editor:{kind}:{digest}"
+
+
+def _table_size_estimate(cur, db_alias, from_sql):
+    """pg_class.reltuples for the table (-1 if never analyzed), cached briefly."""
+    key = _count_cache_key("size", db_alias, from_sql)
+    size = cache.get(key)
+    if size is None:
+        cur.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [from_sql])
+        row = cur.fetchone()
+        size = row[0] if row else -1
+        cache.set(key, size, _FILTERED_COUNT_TIMEOUT)
+    return size
+
+
+def _table_row_count(cur, db_alias, from_sql, where_sql, params):
+    """Return (total rows, is_estimate) for the grid pager."""
+    size = _table_size_estimate(cur, db_alias, from_sql)
+    if size >= _EXACT_COUNT_THRESHOLD and not params:
+        return size, True
+    key = _count_cache_key("count", db_alias, from_sql, where_sql, params)
+    total = cache.get(key)
+    if total is None:
+        if size >= _EXACT_COUNT_THRESHOLD:
+            # Filters on a large table (ILIKE '%term%' often means a full scan): use the
+            # planner's row estimate for the filtered query instead of counting
+            cur.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {from_sql} WHERE {where_sql}", params)
+            plan = cur.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            total = (int(plan[0]["Plan"]["Plan Rows"]), True)
+        else:
+            # -1 (never vacuumed/analyzed) or a small table: an exact count is cheap enough
+            cur.execute(f"SELECT COUNT(*) FROM {from_sql} WHERE {where_sql}", params)
+            total = (cur.fetchone()[0], False)
+        cache.set(key, total, _FILTERED_COUNT_TIMEOUT)
+    return total
+
+
+# Text-like types whose values can be arbitrarily large; the grid shows a prefix only
+_WIDE_TYPES = frozenset({"text", "json", "jsonb", "xml", "bytea"})
+_WIDE_CELL_CHARS = 1024
+
+
+class _TruncatedText(str):
+    """Display prefix of a cell value that was longer than _WIDE_CELL_CHARS."""
+    __slots__ = ()
+    truncated = True
+
+
+def _mark_truncated_cells(rows, wide_indices):
+    """Replace over-long wide cells in-place with their _TruncatedText prefix."""
+    for n, row in enumerate(rows):
+        if any(row[i] is not None and len(row[i]) > _WIDE_CELL_CHARS for i in wide_indices):
+            row = list(row)
+            for i in wide_indices:
+                if row[i] is not None and len(row[i]) > _WIDE_CELL_CHARS:
+                    row[i] = _TruncatedText(row[i][:_WIDE_CELL_CHARS])
+            rows[n] = tuple(row)
+
+
+# The subset of a Django Page the grid pager uses, built without a Paginator
+_PageInfo = namedtuple(
+    "_PageInfo", "number num_pages count has_previous has_next previous_page_number next_page_number"
+)
+
+
+@lru_cache(maxsize=256)
+def _grid_config_json(db_alias, schema_name, table_name, columns, pk_columns, pk_uses_sequence):
+    """
+    The grid's JSON config for one table's metadata, with a "__CSRF__" placeholder for
+    the per-request token. Metadata changes give new arguments and so a new entry.
+    """
+    url_args = [db_alias, schema_name, table_name]
+    return _json_dumps({
+        # First, so the placeholder is the first match even if a column shares its name
+        "csrfToken": "__CSRF__",
+        "dbAlias": db_alias,
+        "schemaName": schema_name,
+        "tableName": table_name,
+        "pkColumns": pk_columns,
+        "pkUsesSequence": pk_uses_sequence,
+        "columns": [{"name": c.name, "dataType": c.data_type, "isNullable": c.is_nullable, "columnDefault": c.column_default} for c in columns],
+        "saveUrl": reverse("table_save_rows", args=url_args),
+        "insertUrl": reverse("table_insert_row", args=url_args),
+        "deleteUrl": reverse("table_delete_rows", args=url_args),
+    }).decode()
+
+
+def _grid_ordering(request, column_names, pk_columns):
+    """Return (order column, "asc"/"desc") from the sort/order GET params, allowlisted."""
+    sort_col = request.GET.get("sort")
+    sort_order = (request.GET.get("order") or "asc").lower()
+    if sort_order not in ("asc", "desc"):
+        sort_order = "asc"
+    if sort_col and sort_col in column_names:
+        return sort_col, sort_order
+    return (pk_columns[0] if pk_columns else column_names[0]), sort_order
+
+
+def _parse_int_filter(val):
+    try:
+        return int(val)
+    except ValueError:
+        return None
+
+
+def _parse_date_filter(val):
+    try:
+        return date.fromisoformat(val)
+    except ValueError:
+        return None
+
+
+# Column types whose filter term is compared with = when it parses as that type
+_EQ_FILTER_PARSERS = {t: _parse_int_filter for t in _INT_TYPES}
+_EQ_FILTER_PARSERS.update({t: _parse_date_filter for t in _DATE_TYPES})
+
+
+@lru_cache(maxsize=1024)
+def _filter_where_sql(filters):
+    """WHERE clause template for (column, kind) filters, one %s per filter.
+
+    kind is "eq" for a typed equality, "text" for ILIKE on a text column and
+    "cast" for ILIKE on any other column cast to text.
+    """
+    if not filters:
+        return "1=1"
+    # Typed equality and uncast text ILIKE keep the column usable by its indexes
+    # (btree, or pg_trgm gin_trgm_ops for '%term%'); ::text costs a per-row cast
+    templates = {"eq": "{} = %s", "text": "{} ILIKE %s", "cast": "{}::text ILIKE %s"}
+    return " AND ".join(templates[kind].format(quote_identifier(col)) for col, kind in filters)
+
+
+def _requested_filters(request, column_names):
+    """Return {column: raw value} for the filter_<column> GET params naming a known column."""
+    # Only look at the filter_* params actually sent, not every column of the table
+    return {
+        key[7:]: val for key, val in request.GET.items()
+        if key.startswith("filter_") and key[7:] in column_names
+    }
+
+
+def _grid_filter_sql(requested, columns):
+    """Build the WHERE clause and params for the filters _requested_filters() returned."""
+    column_by_name = {c.name: c for c in columns}
+    terms = {}
+    for col, val in requested.items():
+        val = val.strip()
+        if val:
+            terms[col] = val
+    if not terms:
+        return _filter_where_sql(()), []
+    filters = []
+    params = []
+    for col in sorted(terms):
+        val = terms[col]
+        data_type = normalize_type(column_by_name[col].data_type or "")
+        parse = _EQ_FILTER_PARSERS.get(data_type)
+        typed = parse(val) if parse else None
+        if typed is not None:
+            filters.append((col, "eq"))
+            params.append(typed)
+        else:
+            filters.append((col, "text" if data_type in TEXT_TYPES else "cast"))
+            params.append(f"%{val}%")
+    return _filter_where_sql(tuple(filters)), params
+
+
+class _Echo:
+    """Pseudo-buffer whose write() returns the value, so csv.writer output can be streamed."""
+    
+    def write(self, value):
+        return value
+
+
+def _stream_csv(conn, sql, params, header):
+    """
+    Yield CSV lines for a query, reading it through a server-side cursor so memory
+    stays flat regardless of result size (Django fetches 2000 rows per round-trip).
+    
+    The cursor is forward-only: Django declares it NO SCROLL, and it is read inside a
+    transaction so it is not WITH HOLD either. A holdable cursor would make PostgreSQL
+    run the whole query and materialize the result when the DECLARE commits; this one
+    produces rows as they are fetched. If the client disconnects, the generator is
+    closed and the transaction rolls back, releasing the cursor.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    with transaction.atomic(using=conn.alias):
+        with conn.chunked_cursor() as cur:
+            cur.execute(sql, params)
+            for row in cur:
+                yield writer.writerow(row)
+
+
+_JSON_TYPES = frozenset({"json", "jsonb"})
+
+
+@lru_cache(maxsize=512)
+def _update_rows_sql(from_sql, pk_columns, update_cols, json_cols=frozenset(), source=None):
+    """
+    Build an UPDATE that applies a JSON array of rows (column name -> value), matched by
+    primary key. json_populate_recordset() converts the rows with the table's own row
+    type, so every value is cast to its column's type; json_cols maps the json/jsonb
+    columns to their type. With source (a table already holding typed rows) the UPDATE
+    reads from it instead and takes no parameters. Arguments are tuples (json_cols a
+    tuple of pairs) so the statement is built once per table and column set.
+    """
+    quote = quote_identifier
+    json_types = dict(json_cols)
+
+    def set_expr(c):
+        if source is None and c in json_types:
+            # json_populate_recordset keeps a JSON string as a string scalar for
+            # json/jsonb columns; parse the edited text as a document instead
+            return f"{quote(c)} = (v.{quote(c)} #>> '{{}}')::{json_types[c]}"
+        return f"{quote(c)} = v.{quote(c)}"
+
+    set_sql = ", ".join(set_expr(c) for c in update_cols)
+    match_sql = " AND ".join(f"t.{quote(k)} = v.{quote(k)}" for k in pk_columns)
+    if source is None:
+        source = f"json_populate_recordset(NULL::{from_sql}, %s)"
+    return f"UPDATE {from_sql} AS t SET {set_sql} FROM {source} AS v WHERE {match_sql}"
+
+
+def _update_rows(cur, sql, rows):
+    """Run an _update_rows_sql() statement for rows; return the number updated."""
+    cur.execute(sql, [_json_dumps(rows).decode()])
+    return cur.rowcount
+
+
+@lru_cache(maxsize=256)
+def _combined_update_sql(statements):
+    """
+    Join _update_rows_sql() statements (one per column set) into one statement of
+    data-modifying CTEs that returns the total number of rows updated. Each statement
+    keeps its own parameter, in order.
+    """
+    ctes = ", ".join(f"u{i} AS ({sql} RETURNING 1)" for i, sql in enumerate(statements))
+    total = " + ".join(f"(SELECT count(*) FROM u{i})" for i in range(len(statements)))
+    return f"WITH {ctes} SELECT {total}"
+
+
+def _can_combine_updates(groups, pk_columns):
+    """
+    True if the column-set groups may run as one _combined_update_sql() statement: more
+    than one group, none large enough for COPY, and no primary key in two groups (the
+    CTEs of one statement must not update the same row twice).
+    """
+    if len(groups) < 2 or any(len(entries) > _COPY_UPDATE_THRESHOLD for entries in groups.values()):
+        return False
+    seen = set()
+    try:
+        for entries in groups.values():
+            keys = {tuple(values[k] for k in pk_columns) for _, values in entries}
+            if not seen.isdisjoint(keys):
+                return False
+            seen |= keys
+    except TypeError:
+        # Unhashable key values (lists, objects); let the per-group path report them
+        return False
+    return True
+
+
+def _run_bisected(db_alias, run, items, errors, describe):
+    """
+    Call run(items) under a savepoint and return its row count. If it fails, retry
+    each half the same way, so only the items that fail on their own are added to
+    errors, as describe(item) plus the error message.
+    """
+    if not items:
+        return 0
+    try:
+        with transaction.atomic(using=db_alias):
+            return run(items)
+    except Exception as e:
+        if len(items) == 1:
+            errors.append({**describe(items[0]), "error": str(e)})
+            return 0
+    mid = len(items) // 2
+    return (
+        _run_bisected(db_alias, run, items[:mid], errors, describe)
+        + _run_bisected(db_alias, run, items[mid:], errors, describe)
+    )
+
+
+def _describe_row(entry):
+    return {"row": entry[0]}
+
+
+# Column sets with more edited rows than this are staged with COPY instead of
+# being sent as one JSON parameter
+_COPY_UPDATE_THRESHOLD = 500
+# Inserts of more rows than this are streamed with COPY instead of INSERT ... VALUES
+_COPY_INSERT_THRESHOLD = 500
+_COPY_STAGING_TABLE = "editor_save_rows"
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_text(val):
+    """Format a value as a field of COPY's text format."""
+    if val is None:
+        return "\\N"
+    if isinstance(val, bool):
+        return "t" if val else "f"
+    if isinstance(val, (dict, list)):
+        val = _json_dumps(val).decode()
+    return str(val).translate(_COPY_ESCAPES)
+
+
+def _copy_buffer(rows):
+    """Return a file of value sequences in COPY's text format, one line per row."""
+    return io.StringIO("".join("\t".join(map(_copy_text, row)) + "\n" for row in rows))
+
+
+def _copy_update_rows(cur, from_sql, pk_columns, update_cols, rows):
+    """
+    Apply rows through a temp table loaded with COPY, then one UPDATE ... FROM it.
+    Returns the number of rows updated. Run inside a transaction (the temp table
+    is dropped here, and ON COMMIT DROP covers an aborted savepoint).
+    """
+    quote = quote_identifier
+    cols = [*pk_columns, *update_cols]
+    col_sql = ", ".join(quote(c) for c in cols)
+    staging = quote(_COPY_STAGING_TABLE)
+    # Same column types as the target table, so COPY parses every value as its column does
+    cur.execute(
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS SELECT {col_sql} FROM {from_sql} WITH NO DATA"
+    )
+    cur.copy_expert(
+        f"COPY {staging} ({col_sql}) FROM STDIN", _copy_buffer([row[c] for c in cols] for row in rows)
+    )
+    cur.execute(_update_rows_sql(from_sql, pk_columns, update_cols, source=staging))
+    updated = cur.rowcount
+    cur.execute(f"DROP TABLE {staging}")
+    return updated
+
+
+def _encode_page_cursor(order_col, sort_order, values):
+    """Encode the last row's sort key as an opaque URL-safe token for the next page."""
+    # orjson rejects times with a tzinfo (timetz columns) instead of calling default
+    values = [v.isoformat() if type(v) is time else v for v in values]
+    payload = _json_dumps([order_col, sort_order, values])
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def _decode_page_cursor(token, order_col, sort_order, size):
+    """Return the sort key values in a page cursor, or None if it is invalid or for another ordering."""
+    try:
+        payload = _json_loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        cursor_col, cursor_order, values = payload
+    except (binascii.Error, ValueError, TypeError):
+        return None
+    if cursor_col != order_col or cursor_order != sort_order:
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+# Accepted boolean spellings (lower-cased) -> value; anything else is sent as NULL
+_BOOL_VALUES = {
+    **dict.fromkeys(("t", "true", "1", "yes", "on"), True),
+    **dict.fromkeys(("f", "false", "0", "no", "off"), False),
+}
+
+
+def _is_blank(val):
+    return val is None or (isinstance(val, str) and val.strip() == "")
+
+
+def _coerce_identity(val):
+    return val
+
+
+def _coerce_temporal(val):
+    # Empty input clears the value; anything else is parsed by PostgreSQL
+    return None if _is_blank(val) else val
+
+
+def _coerce_bool(val):
+    if type(val) is bool:
         return val
-    dt = (data_type or "").strip().lower()
-    if dt in _DATE_TYPES or dt in _TS_TYPES or dt in _TIME_TYPES:
-        if val is None or (isinstance(val, str) and val.strip() == ""):
-            return None
-    if dt in _BOOL_TYPES:
-        if val is None or (isinstance(val, str) and val.strip() == ""):
-            return None
-        if isinstance(val, bool):
-            return val
-        s = str(val).strip().lower()
-        if s in ("t", "true", "1", "yes", "on"):
-            return True
-        if s in ("f", "false", "0", "no", "off"):
-            return False
+    if _is_blank(val):
         return None
-    if dt in _INT_TYPES and val is not None and (isinstance(val, str) and val.strip() != "" or isinstance(val, (int, float))):
+    return _BOOL_VALUES.get(str(val).strip().lower())
+
+
+def _coerce_int(val):
+    # Exact type checks first: JSON numbers arrive as int/float and need no work
+    if type(val) is int:
+        return val
+    if isinstance(val, float) or (isinstance(val, str) and val.strip() != ""):
         try:
-            return int(val) if not isinstance(val, int) else val
+            return int(val)
         except (ValueError, TypeError):
             return val
-    if dt in _FLOAT_TYPES and val is not None and (isinstance(val, str) and val.strip() != "" or isinstance(val, (int, float))):
+    return val
+
+
+def _coerce_float(val):
+    if type(val) is float:
+        return val
+    if isinstance(val, int) or (isinstance(val, str) and val.strip() != ""):
         try:
-            return float(val) if not isinstance(val, float) else val
+            return float(val)
         except (ValueError, TypeError):
             return val
-    if dt in _DECIMAL_TYPES and val is not None and (isinstance(val, str) and val.strip() != "" or isinstance(val, (int, float, Decimal))):
+    return val
+
+
+def _coerce_decimal(val):
+    if type(val) is Decimal:
+        return val
+    if isinstance(val, (int, float)) or (isinstance(val, str) and val.strip() != ""):
         try:
             return Decimal(str(val))
-        except (ValueError, TypeError, Exception):
+        except (ArithmeticError, ValueError, TypeError):
             return val
     return val
 
 
+# Normalized PostgreSQL data_type -> function coercing a submitted value for DB write
+_COERCERS = {
+    **dict.fromkeys(_DATE_TYPES | _TS_TYPES | _TIME_TYPES, _coerce_temporal),
+    **dict.fromkeys(_BOOL_TYPES, _coerce_bool),
+    **dict.fromkeys(_INT_TYPES, _coerce_int),
+    **dict.fromkeys(_FLOAT_TYPES, _coerce_float),
+    **dict.fromkeys(_DECIMAL_TYPES, _coerce_decimal),
+}
+
+
+@lru_cache(maxsize=128)
+def _make_coercer(data_type):
+    """Return the coercion function for a PostgreSQL data_type (identity for other types)."""
+    if data_type is None:
+        return _coerce_identity
+    return _COERCERS.get(normalize_type(data_type), _coerce_identity)
+
+
 # Database Configuration Management Views
 
 @login_required
 def database_config_list(request):
     """List all database configurations for the current user."""
-    databases = DatabaseConfig.objects.filter(user=request.user)
+    databases = DatabaseConfig.objects.list_for_user(request.user)
     return render(
         request,
         "editor/database_config_list.html",
@@ -96,12 +559,18 @@ def database_config_list(request):
 def database_config_add(request):
     """Add a new database configuration."""
     if request.method == "POST":
-        form = DatabaseConfigForm(request.POST, user=request.user)
+        form = DatabaseConfigForm(
+            request.POST,
+            user=request.user,
+            tested_connections=request.session.get(_TESTED_CONNECTIONS_SESSION_KEY),
+        )
         if form.is_valid():
             db_config = form.save()
+            if not form.connection_verified:
+                schedule_connection_test(db_config.pk)
             # Load the connection immediately
             try:
-                ensure_database_connection(db_config.alias, user=request.user)
+                ensure_database_connection(db_config.alias, user=request.user, db_config=db_config)
                 messages.success(request, f"Database '{db_config.name}' added successfully.")
                 return redirect("database_config_list")
             except Exception as e:
@@ -123,12 +592,26 @@ def database_config_edit(request, pk):
     db_config = get_object_or_404(DatabaseConfig, pk=pk, user=request.user)
     
     if request.method == "POST":
-        form = DatabaseConfigForm(request.POST, instance=db_config, user=request.user)
+        # Read before validation copies the submitted values onto the instance
+        old_server = (db_config.host, db_config.port, db_config.database, db_config.username)
+        old_password = db_config.password
+        form = DatabaseConfigForm(
+            request.POST,
+            instance=db_config,
+            user=request.user,
+            tested_connections=request.session.get(_TESTED_CONNECTIONS_SESSION_KEY),
+        )
         if form.is_valid():
             db_config = form.save()
+            if not form.connection_verified:
+                schedule_connection_test(db_config.pk)
+            new_server = (db_config.host, db_config.port, db_config.database, db_config.username)
+            if new_server != old_server or db_config.password != old_password:
+                # Warm test connections for the old parameters are no longer useful
+                close_test_pools(*old_server)
             # Reload connection with new config
             try:
-                ensure_database_connection(db_config.alias, user=request.user)
+                ensure_database_connection(db_config.alias, user=request.user, db_config=db_config)
                 messages.success(request, f"Database '{db_config.name}' updated successfully.")
                 return redirect("database_config_list")
             except Exception as e:
@@ -169,28 +652,40 @@ def database_config_delete(request, pk):
 def database_config_test(request):
     """AJAX endpoint to test database connection."""
     if request.method != "POST":
-        return JsonResponse({"ok": False, "error": "POST required"})
+        return _json_response({"ok": False, "error": "POST required"})
     
     try:
-        data = json.loads(request.body)
-        host = data.get("host")
-        port = data.get("port")
-        database = data.get("database")
-        username = data.get("username")
+        data = _json_loads(request.body)
+        # Strip like the form fields do, so the fingerprint matches the submitted form
+        host = str(data.get("host") or "").strip()
+        port = str(data.get("port") or "").strip()
+        database = str(data.get("database") or "").strip()
+        username = str(data.get("username") or "").strip()
         password = data.get("password")
+        schema = str(data.get("schema") or "").strip() or None
+        config_pk = data.get("config")
+        if not password and isinstance(config_pk, int):
+            # Edit form: a blank password means "keep the stored one", as on save
+            stored = DatabaseConfig.objects.filter(pk=config_pk, user=request.user).first()
+            password = stored.password if stored else None
         
         if not all([host, port, database, username, password]):
-            return JsonResponse({"ok": False, "error": "Missing required fields"})
+            return _json_response({"ok": False, "error": "Missing required fields"})
         
-        success, error = test_database_connection(host, port, database, username, password)
+        success, error = test_database_connection(host, port, database, username, password, schema=schema)
         if success:
-            return JsonResponse({"ok": True, "message": "Connection successful"})
+            # Remember the tested parameters so saving the form can skip a second live test
+            if schema:
+                tested = request.session.get(_TESTED_CONNECTIONS_SESSION_KEY, [])
+                tested.append(connection_fingerprint(host, port, database, username, password, schema))
+                request.session[_TESTED_CONNECTIONS_SESSION_KEY] = tested[-10:]
+            return _json_response({"ok": True, "message": "Connection successful"})
         else:
-            return JsonResponse({"ok": False, "error": error})
+            return _json_response({"ok": False, "error": error})
     except json.JSONDecodeError:
-        return JsonResponse({"ok": False, "error": "Invalid JSON"})
+        return _json_response({"ok": False, "error": "Invalid JSON"})
     except Exception as e:
-        return JsonResponse({"ok": False, "error": str(e)})
+        return _json_response({"ok": False, "error": str(e)})
 
 
 def home_redirect(request):
@@ -202,7 +697,7 @@ def database_list(request):
     """List all databases for the current user."""
     # Load user's database connections
     load_user_databases(request.user)
-    databases = DatabaseConfig.objects.filter(user=request.user)
+    databases = DatabaseConfig.objects.list_for_user(request.user)
     return render(
         request,
         "editor/database_list.html",
@@ -214,22 +709,12 @@ def database_list(request):
 def schema_list(request, db_alias):
     # Verify database ownership and ensure connection exists
     db_config = get_object_or_404(DatabaseConfig, alias=db_alias, user=request.user)
-    ensure_database_connection(db_alias, user=request.user)
+    ensure_database_connection(db_alias, user=request.user, db_config=db_config)
     
     refresh = request.GET.get("refresh") == "1"
     try:
-        schemas = get_schemas(db_alias, refresh=refresh)
-        # Check which schemas have tables (optimized - only check if needed)
-        schema_info = []
-        for schema in schemas:
-            try:
-                # Quick check: try to get tables with refresh=False (uses cache if available)
-                tables = get_tables(db_alias, schema, refresh=False)
-                has_tables = len(tables) > 0
-            except Exception:
-                # If check fails, assume no tables to avoid blocking the page
-                has_tables = False
-            schema_info.append({"name": schema, "has_tables": has_tables})
+        schema_info = get_schemas_with_table_flags(db_alias, refresh=refresh)
+        schemas = [info["name"] for info in schema_info]
     except (OperationalError, ProgrammingError) as e:
         return render(
             request,
@@ -249,7 +734,7 @@ def schema_create(request, db_alias):
     """Create a new schema."""
     # Verify database ownership and ensure connection exists
     db_config = get_object_or_404(DatabaseConfig, alias=db_alias, user=request.user)
-    ensure_database_connection(db_alias, user=request.user)
+    ensure_database_connection(db_alias, user=request.user, db_config=db_config)
     
     if request.method == "POST":
         form = CreateSchemaForm(request.POST)
@@ -276,7 +761,7 @@ def schema_delete(request, db_alias, schema_name):
     """Delete a schema."""
     # Verify database ownership and ensure connection exists
     db_config = get_object_or_404(DatabaseConfig, alias=db_alias, user=request.user)
-    ensure_database_connection(db_alias, user=request.user)
+    ensure_database_connection(db_alias, user=request.user, db_config=db_config)
     
     # Verify schema exists
     try:
@@ -317,7 +802,7 @@ def schema_delete(request, db_alias, schema_name):
 def table_list(request, db_alias, schema_name):
     # Verify database ownership and ensure connection exists
     db_config = get_object_or_404(DatabaseConfig, alias=db_alias, user=request.user)
-    ensure_database_connection(db_alias, user=request.user)
+    ensure_database_connection(db_alias, user=request.user, db_config=db_config)
     
     try:
         valid_schemas = get_schemas(db_alias, refresh=False)
@@ -332,7 +817,14 @@ def table_list(request, db_alias, schema_name):
         return HttpResponseBadRequest("Unknown schema")
     refresh = request.GET.get("refresh") == "1"
     try:
-        tables = get_tables(db_alias, schema_name, refresh=refresh)
+        # One query lists the tables and warms per-table metadata for the whole schema,
+        # so get_tables below and opening a table hit the cache
+        prefetch_schema_metadata(db_alias, schema_name, refresh=refresh)
+        prefetched = True
+    except (OperationalError, ProgrammingError):
+        prefetched = False
+    try:
+        tables = get_tables(db_alias, schema_name, refresh=refresh and not prefetched)
     except (OperationalError, ProgrammingError) as e:
         return render(
             request,
@@ -351,33 +843,13 @@ def table_list(request, db_alias, schema_name):
 def table_grid(request, db_alias, schema_name, table_name):
     # Verify database ownership and ensure connection exists
     db_config = get_object_or_404(DatabaseConfig, alias=db_alias, user=request.user)
-    ensure_database_connection(db_alias, user=request.user)
+    ensure_database_connection(db_alias, user=request.user, db_config=db_config)
     
-    try:
-        valid_schemas = get_schemas(db_alias, refresh=False)
-    except (OperationalError, ProgrammingError) as e:
-        return render(
-            request,
-            "editor/error.html",
-            {"message": "Could not connect to database.", "detail": str(e), "back_url": reverse("database_list")},
-            status=502,
-        )
-    if schema_name not in valid_schemas:
-        return HttpResponseBadRequest("Unknown schema")
     refresh = request.GET.get("refresh") == "1"
     try:
-        tables = get_tables(db_alias, schema_name, refresh=refresh)
-    except (OperationalError, ProgrammingError) as e:
-        return render(
-            request,
-            "editor/error.html",
-            {"message": "Could not list tables.", "detail": str(e), "back_url": reverse("table_list", args=[db_alias, schema_name])},
-            status=502,
-        )
-    if table_name not in tables:
-        return HttpResponseBadRequest("Unknown table")
-    try:
-        columns, pk_columns = get_table_meta(db_alias, schema_name, table_name, refresh=refresh)
+        columns, pk_columns, pk_uses_sequence = get_table_info(db_alias, schema_name, table_name, refresh=refresh)
+    except LookupError as e:
+        return HttpResponseBadRequest(f"Unknown {e.args[0]}")
     except (OperationalError, ProgrammingError) as e:
         return render(
             request,
@@ -385,49 +857,89 @@ def table_grid(request, db_alias, schema_name, table_name):
             {"message": "Could not load table metadata.", "detail": str(e), "back_url": reverse("table_list", args=[db_alias, schema_name])},
             status=502,
         )
-    column_names = [c["name"] for c in columns]
-    col_allowlist = set(column_names)
+    column_names = [c.name for c in columns]
+    order_col, sort_order = _grid_ordering(request, column_names, pk_columns)
 
-    sort_col = request.GET.get("sort")
-    sort_order = (request.GET.get("order") or "asc").lower()
-    if sort_order not in ("asc", "desc"):
-        sort_order = "asc"
-    if sort_col and sort_col in col_allowlist:
-        order_col = sort_col
-    else:
-        order_col = pk_columns[0] if pk_columns else column_names[0]
-
-    from django.db import connections
     conn = connections[db_alias]
-    quoted_schema = conn.ops.quote_name(schema_name)
-    quoted_table = conn.ops.quote_name(table_name)
-    # Build SELECT with allowlisted WHERE (filters) and ORDER BY
-    where_parts = []
-    params = []
-    for col in column_names:
-        val = request.GET.get(f"filter_{col}", "").strip()
-        if val:
-            where_parts.append(f'{conn.ops.quote_name(col)}::text ILIKE %s')
-            params.append(f"%{val}%")
-    where_sql = " AND ".join(where_parts) if where_parts else "1=1"
-    order_sql = f'{conn.ops.quote_name(order_col)} {sort_order.upper()}'
-    per_page = min(int(request.GET.get("per_page", 50) or 50), 200)
-    page_num = max(1, int(request.GET.get("page", 1) or 1))
+    quoted_schema = quote_identifier(schema_name)
+    quoted_table = quote_identifier(table_name)
+    # Parsed once: builds the WHERE clause and refills the filter inputs below
+    filter_values = _requested_filters(request, frozenset(column_names))
+    where_sql, params = _grid_filter_sql(filter_values, columns)
+    per_page = _clamped_int(request.GET.get("per_page"), 50, 1, 200)
+    page_num = _clamped_int(request.GET.get("page"), 1, 1, _MAX_PAGE_NUM)
     offset = (page_num - 1) * per_page
 
+    # Keyset ("seek") pagination: order by the sort column with the primary key as
+    # tie-breaker, and continue after the previous page's last key instead of
+    # skipping rows with OFFSET. Only used when every key column is NOT NULL (row
+    # comparisons drop NULLs) and of a type that round-trips through the cursor.
+    column_by_name = {c.name: c for c in columns}
+    seek_cols = [order_col] + [c for c in pk_columns if c != order_col]
+    use_keyset = bool(pk_columns) and all(
+        not column_by_name[c].is_nullable
+        and normalize_type(column_by_name[c].data_type or "") in _KEYSET_TYPES
+        for c in seek_cols
+    )
+    seek_sql = ""
+    seek_params = []
+    seek_backward = False
+    if use_keyset:
+        # "before" (from the Previous link) reads the rows preceding a cursor in the
+        # reverse order and flips them back below
+        after = request.GET.get("after")
+        before = not after and page_num > 1 and request.GET.get("before")
+        cursor_values = (after or before) and _decode_page_cursor(
+            after or before, order_col, sort_order, len(seek_cols)
+        )
+        seek_backward = bool(before and cursor_values)
+        scan_order = {"asc": "desc", "desc": "asc"}[sort_order] if seek_backward else sort_order
+        order_sql = ", ".join(f"{quote_identifier(c)} {scan_order.upper()}" for c in seek_cols)
+        if cursor_values:
+            seek_sql = " AND ({}) {} ({})".format(
+                ", ".join(quote_identifier(c) for c in seek_cols),
+                "<" if scan_order == "desc" else ">",
+                ", ".join(["%s"] * len(seek_cols)),
+            )
+            seek_params = cursor_values
+            offset = 0
+    else:
+        order_sql = f'{quote_identifier(order_col)} {sort_order.upper()}'
+
+    # Select the known columns explicitly; wide ones are cut to _WIDE_CELL_CHARS for
+    # display (one extra character shows whether anything was cut). Sort/key columns
+    # stay whole because the page cursor and data-pk are built from them.
+    wide_indices = []
+    select_parts = []
+    for i, c in enumerate(columns):
+        quoted = quote_identifier(c.name)
+        if normalize_type(c.data_type or "") in _WIDE_TYPES and c.name not in seek_cols and c.name not in pk_columns:
+            wide_indices.append(i)
+            select_parts.append(f"LEFT({quoted}::text, {_WIDE_CELL_CHARS + 1}) AS {quoted}")
+        else:
+            select_parts.append(quoted)
+    from_sql = f"{quoted_schema}.{quoted_table}"
     try:
         with conn.cursor() as cur:
+            # Sent as a plain statement, not PREPARE/EXECUTE: named statements would outlive
+            # the request on the kept-alive connection and fail behind transaction-pooling
+            # proxies (PgBouncer), and one execution per page leaves little plan reuse to gain
             cur.execute(
-                f'SELECT * FROM {quoted_schema}.{quoted_table} WHERE {where_sql} ORDER BY {order_sql} LIMIT %s OFFSET %s',
-                params + [per_page, offset],
+                f'SELECT {", ".join(select_parts)} FROM {from_sql} WHERE {where_sql}{seek_sql} ORDER BY {order_sql} LIMIT %s OFFSET %s',
+                params + seek_params + [per_page + 1, offset],
             )
             rows = cur.fetchall()
-            column_names = [cur.description[i][0] for i in range(len(cur.description))]
-            cur.execute(
-                f'SELECT COUNT(*) FROM {quoted_schema}.{quoted_table} WHERE {where_sql}',
-                params,
-            )
-            total = cur.fetchone()[0]
+            # One row past the page ("limit + 1") shows whether more rows follow in scan
+            # order without relying on the count, which may be an estimate
+            has_more = len(rows) > per_page
+            del rows[per_page:]
+            if seek_backward:
+                rows.reverse()
+            if not has_more and not seek_backward and (rows or page_num == 1):
+                # The page reached the end of the results, so the total is known (set below)
+                total, count_is_estimate = 0, False
+            else:
+                total, count_is_estimate = _table_row_count(cur, db_alias, from_sql, where_sql, params)
     except (OperationalError, ProgrammingError) as e:
         return render(
             request,
@@ -436,25 +948,47 @@ def table_grid(request, db_alias, schema_name, table_name):
             status=502,
         )
 
-    paginator = Paginator(range(total), per_page)
-    page = paginator.page(page_num)
-    row_data = [dict(zip(column_names, row)) for row in rows]
+    # Estimated or cached counts can be off; what this page returned bounds the total
+    rows_before = (page_num - 1) * per_page
+    if seek_backward:
+        # The cursor came from the first row of the following page, so rows follow this one
+        total = max(total, rows_before + len(rows) + 1)
+    elif rows and not has_more:
+        total = rows_before + len(rows)
+        count_is_estimate = False
+    elif not rows:
+        # Past the end: no rows at this offset, whatever an estimate says
+        total = min(total, rows_before)
+    else:
+        total = max(total, rows_before + len(rows) + has_more)
+    num_pages = max(1, -(-total // per_page))
+    page = _PageInfo(
+        page_num, num_pages, total, page_num > 1, page_num < num_pages, page_num - 1, page_num + 1
+    )
+    if wide_indices:
+        _mark_truncated_cells(rows, wide_indices)
+    # Rows stay as the cursor's tuples in `columns` order (the SELECT list above), so
+    # the template and these lookups index cells by column position
+    column_index = {name: i for i, name in enumerate(column_names)}
+    # Per-column input attributes are resolved here once, not once per rendered cell
+    grid_columns = [
+        (i, c, input_type_for_column(c), is_datetime_column(c)) for i, c in enumerate(columns)
+    ]
+    pk_fields = [(name, column_index[name]) for name in pk_columns]
+    next_cursor = prev_cursor = None
+    if use_keyset and rows:
+        if page.has_next:
+            next_cursor = _encode_page_cursor(order_col, sort_order, [rows[-1][column_index[c]] for c in seek_cols])
+        if page.has_previous:
+            prev_cursor = _encode_page_cursor(order_col, sort_order, [rows[0][column_index[c]] for c in seek_cols])
 
-    filter_values = {col: request.GET.get(f"filter_{col}", "") for col in column_names}
+    # Only the filters sent; the template's get_item shows "" for the other columns
     has_filters = any(v.strip() for v in filter_values.values())
-    pk_uses_sequence = get_pk_sequence_columns(db_alias, schema_name, table_name, refresh=refresh)
-    config_json = json.dumps({
-        "dbAlias": db_alias,
-        "schemaName": schema_name,
-        "tableName": table_name,
-        "pkColumns": pk_columns,
-        "pkUsesSequence": pk_uses_sequence,
-        "columns": [{"name": c["name"], "dataType": c["data_type"], "isNullable": c["is_nullable"], "columnDefault": c.get("column_default")} for c in columns],
-        "saveUrl": reverse("table_save_rows", args=[db_alias, schema_name, table_name]),
-        "insertUrl": reverse("table_insert_row", args=[db_alias, schema_name, table_name]),
-        "deleteUrl": reverse("table_delete_rows", args=[db_alias, schema_name, table_name]),
-        "csrfToken": get_token(request),
-    })
+    # Shared by the sort and pager links; built once instead of per link in the template
+    filter_query = urlencode({f"filter_{col}": v for col, v in filter_values.items() if v})
+    config_json = _grid_config_json(
+        db_alias, schema_name, table_name, tuple(columns), tuple(pk_columns), tuple(pk_uses_sequence)
+    ).replace('"__CSRF__"', _json_dumps(get_token(request)).decode(), 1)
 
     return render(
         request,
@@ -467,156 +1001,237 @@ def table_grid(request, db_alias, schema_name, table_name):
             "columns": columns,
             "column_names": column_names,
             "pk_columns": pk_columns,
-            "rows": row_data,
+            "rows": rows,
+            "grid_columns": grid_columns,
+            "pk_fields": pk_fields,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+            "count_is_estimate": count_is_estimate,
             "page": page,
             "sort_col": order_col,
             "sort_order": sort_order,
             "filter_values": filter_values,
             "has_filters": has_filters,
+            "filter_query": filter_query,
             "config_json": config_json,
         },
     )
 
 
+@login_required
+def table_export(request, db_alias, schema_name, table_name):
+    """GET: stream the table as CSV, with the grid's current filters and sort order."""
+    db_config = get_object_or_404(DatabaseConfig, alias=db_alias, user=request.user)
+    ensure_database_connection(db_alias, user=request.user, db_config=db_config)
+    
+    try:
+        columns, pk_columns, _ = get_table_info(db_alias, schema_name, table_name)
+    except LookupError as e:
+        return HttpResponseBadRequest(f"Unknown {e.args[0]}")
+    except (OperationalError, ProgrammingError) as e:
+        return render(
+            request,
+            "editor/error.html",
+            {"message": "Could not load table metadata.", "detail": str(e), "back_url": reverse("table_list", args=[db_alias, schema_name])},
+            status=502,
+        )
+    column_names = [c.name for c in columns]
+    order_col, sort_order = _grid_ordering(request, column_names, pk_columns)
+
+    conn = connections[db_alias]
+    where_sql, params = _grid_filter_sql(_requested_filters(request, frozenset(column_names)), columns)
+    select_list = ", ".join(quote_identifier(c) for c in column_names)
+    # Primary key columns break ties so rows with equal sort values export in a stable order
+    order_sql = ", ".join(
+        f"{quote_identifier(c)} {sort_order.upper()}"
+        for c in [order_col] + [c for c in pk_columns if c != order_col]
+    )
+    sql = (
+        f'SELECT {select_list} FROM {quote_identifier(schema_name)}.{quote_identifier(table_name)} '
+        f'WHERE {where_sql} ORDER BY {order_sql}'
+    )
+    response = StreamingHttpResponse(_stream_csv(conn, sql, params, column_names), content_type="text/csv")
+    filename = table_name.replace('"', "")
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
 @login_required
 def table_save_rows(request, db_alias, schema_name, table_name):
     if request.method != "POST":
         return HttpResponseBadRequest("POST required")
     # Verify database ownership and ensure connection exists
     db_config = get_object_or_404(DatabaseConfig, alias=db_alias, user=request.user)
-    ensure_database_connection(db_alias, user=request.user)
+    ensure_database_connection(db_alias, user=request.user, db_config=db_config)
     
-    valid_schemas = get_schemas(db_alias, refresh=False)
-    if schema_name not in valid_schemas:
-        return HttpResponseBadRequest("Unknown schema")
-    tables = get_tables(db_alias, schema_name, refresh=False)
-    if table_name not in tables:
-        return HttpResponseBadRequest("Unknown table")
-    columns, pk_columns = get_table_meta(db_alias, schema_name, table_name, refresh=False)
-    column_names = [c["name"] for c in columns]
-    col_allowlist = set(column_names)
+    try:
+        columns, pk_columns, _ = get_table_info(db_alias, schema_name, table_name)
+    except LookupError as e:
+        return HttpResponseBadRequest(f"Unknown {e.args[0]}")
     pk_set = set(pk_columns)
     if not pk_set:
-        return JsonResponse({"ok": False, "error": "Table has no primary key"})
+        return _json_response({"ok": False, "error": "Table has no primary key"})
+    # Columns a row may change: known names, primary key excluded
+    updatable = frozenset(c.name for c in columns) - pk_set
 
     try:
-        payload = json.loads(request.body)
+        payload = _json_loads(request.body)
     except json.JSONDecodeError:
-        return JsonResponse({"ok": False, "error": "Invalid JSON"})
+        return _json_response({"ok": False, "error": "Invalid JSON"})
     if not isinstance(payload.get("rows"), list):
-        return JsonResponse({"ok": False, "error": "Missing or invalid 'rows' array"})
+        return _json_response({"ok": False, "error": "Missing or invalid 'rows' array"})
 
-    column_by_name = {c["name"]: c for c in columns}
-    from django.db import connections
     conn = connections[db_alias]
-    quoted_schema = conn.ops.quote_name(schema_name)
-    quoted_table = conn.ops.quote_name(table_name)
+    quoted_schema = quote_identifier(schema_name)
+    quoted_table = quote_identifier(table_name)
+    from_sql = f"{quoted_schema}.{quoted_table}"
     errors = []
     updated = 0
+    coercers = {c.name: _make_coercer(c.data_type) for c in columns}
+    json_cols = tuple(
+        (c.name, t) for c in columns if (t := normalize_type(c.data_type or "")) in _JSON_TYPES
+    )
+    pk_key = tuple(pk_columns)
+    # Rows changing the same set of columns share one UPDATE statement
+    groups = {}
+    for row in payload["rows"]:
+        pk = row.get("pk")
+        cols = row.get("columns") or {}
+        if not isinstance(pk, dict) or not pk_set.issubset(pk):
+            errors.append({"row": row, "error": "Invalid or missing primary key"})
+            continue
+        values = {c: coercers[c](v) for c, v in cols.items() if c in updatable}
+        if not values:
+            continue
+        update_cols = tuple(sorted(values))
+        values.update((k, pk[k]) for k in pk_columns)
+        groups.setdefault(update_cols, []).append((row, values))
     try:
         with transaction.atomic(using=db_alias):
             with conn.cursor() as cur:
-                for row in payload["rows"]:
-                    pk = row.get("pk")
-                    cols = row.get("columns") or {}
-                    if not isinstance(pk, dict) or not pk_set.issubset(set(pk.keys())):
-                        errors.append({"row": row, "error": "Invalid or missing primary key"})
-                        continue
-                    update_cols = {k: v for k, v in cols.items() if k in col_allowlist and k not in pk_set}
-                    if not update_cols:
+                pending = groups
+                if _can_combine_updates(groups, pk_key):
+                    # Rows changing different column sets go out as one statement, not one per set
+                    statements = tuple(
+                        _update_rows_sql(from_sql, pk_key, update_cols, json_cols) for update_cols in groups
+                    )
+                    try:
+                        with transaction.atomic(using=db_alias):
+                            cur.execute(
+                                _combined_update_sql(statements),
+                                [_json_dumps([v for _, v in entries]).decode() for entries in groups.values()],
+                            )
+                            updated += cur.fetchone()[0]
+                        pending = {}
+                    except Exception:
+                        # The savepoint rolled it back; apply each set below to find the failing rows
+                        pass
+                for update_cols, entries in pending.items():
+                    # Cached per table and column set, and reused when a failed batch is split below
+                    sql = _update_rows_sql(from_sql, pk_key, update_cols, json_cols)
+
+                    def run(part, sql=sql):
+                        return _update_rows(cur, sql, [values for _, values in part])
+
+                    if len(entries) <= _COPY_UPDATE_THRESHOLD:
+                        updated += _run_bisected(db_alias, run, entries, errors, _describe_row)
                         continue
-                    set_parts = [f'{conn.ops.quote_name(c)} = %s' for c in update_cols]
-                    where_parts = [f'{conn.ops.quote_name(k)} = %s' for k in pk_columns]
-                    col_types = {c: (column_by_name.get(c) or {}).get("data_type") for c in update_cols}
-                    set_vals = [_coerce_value(update_cols[c], col_types.get(c)) for c in update_cols]
-                    where_vals = [pk[k] for k in pk_columns]
-                    sql = f'UPDATE {quoted_schema}.{quoted_table} SET {", ".join(set_parts)} WHERE {" AND ".join(where_parts)}'
                     try:
-                        cur.execute(sql, set_vals + where_vals)
-                        updated += cur.rowcount
-                    except Exception as e:
-                        errors.append({"row": row, "error": str(e)})
+                        with transaction.atomic(using=db_alias):
+                            updated += _copy_update_rows(
+                                cur, from_sql, pk_key, update_cols, [v for _, v in entries]
+                            )
+                    except Exception:
+                        # The savepoint rolled the batch back; split it to find the failing rows
+                        mid = len(entries) // 2
+                        for half in (entries[:mid], entries[mid:]):
+                            updated += _run_bisected(db_alias, run, half, errors, _describe_row)
             if errors:
                 raise ValueError("Row errors")
-        return JsonResponse({"ok": True, "updated": updated})
+        return _json_response({"ok": True, "updated": updated})
     except ValueError:
-        return JsonResponse({"ok": False, "errors": errors})
+        return _json_response({"ok": False, "errors": errors})
 
 
 @login_required
 def table_insert_row(request, db_alias, schema_name, table_name):
-    """POST: insert a new row. PK columns with nextval default are omitted (auto-filled)."""
+    """POST: insert one or more rows. PK columns with a nextval default or identity are omitted (auto-filled)."""
     if request.method != "POST":
         return HttpResponseBadRequest("POST required")
     # Verify database ownership and ensure connection exists
     db_config = get_object_or_404(DatabaseConfig, alias=db_alias, user=request.user)
-    ensure_database_connection(db_alias, user=request.user)
+    ensure_database_connection(db_alias, user=request.user, db_config=db_config)
     
-    valid_schemas = get_schemas(db_alias, refresh=False)
-    if schema_name not in valid_schemas:
-        return HttpResponseBadRequest("Unknown schema")
-    tables = get_tables(db_alias, schema_name, refresh=False)
-    if table_name not in tables:
-        return HttpResponseBadRequest("Unknown table")
-    columns, pk_columns = get_table_meta(db_alias, schema_name, table_name, refresh=False)
-    pk_uses_sequence = get_pk_sequence_columns(db_alias, schema_name, table_name, refresh=False)
-    column_names = [c["name"] for c in columns]
+    try:
+        columns, pk_columns, pk_uses_sequence = get_table_info(db_alias, schema_name, table_name)
+    except LookupError as e:
+        return HttpResponseBadRequest(f"Unknown {e.args[0]}")
+    column_names = [c.name for c in columns]
     col_allowlist = set(column_names)
     pk_set = set(pk_columns)
-    column_by_name = {c["name"]: c for c in columns}
+    column_by_name = {c.name: c for c in columns}
 
     try:
-        payload = json.loads(request.body)
+        payload = _json_loads(request.body)
     except json.JSONDecodeError:
-        return JsonResponse({"ok": False, "error": "Invalid JSON"})
-    cols = payload.get("columns")
-    if not isinstance(cols, dict):
-        return JsonResponse({"ok": False, "error": "Missing or invalid 'columns' object"})
-
-    # Columns to insert: all columns except PK columns that use nextval (omitted so DB fills them).
-    # For other PK columns we require a value. For non-PK, use value or NULL if nullable.
-    insert_cols = []
-    for c in column_names:
-        if c in pk_uses_sequence:
-            continue  # omit; PostgreSQL will use nextval
-        if c not in col_allowlist:
-            continue
-        val = cols.get(c)
-        is_empty = val is None or (isinstance(val, str) and val.strip() == "")
-        if c in pk_set and is_empty:
-            return JsonResponse({"ok": False, "error": f"Primary key column '{c}' is required (no sequence)."})
-        col_info = column_by_name.get(c) or {}
-        if is_empty and not col_info.get("is_nullable"):
-            return JsonResponse({"ok": False, "error": f"Non-nullable column '{c}' requires a value."})
-        insert_cols.append(c)
+        return _json_response({"ok": False, "error": "Invalid JSON"})
+    # Either one row as {"columns": {...}} or several as {"rows": [{"columns": {...}}, ...]}
+    if "rows" in payload:
+        rows = payload["rows"]
+        if not isinstance(rows, list) or not rows:
+            return _json_response({"ok": False, "error": "Missing or invalid 'rows' array"})
+        row_cols = [r.get("columns") if isinstance(r, dict) else None for r in rows]
+    else:
+        row_cols = [payload.get("columns")]
+    if not all(isinstance(cols, dict) for cols in row_cols):
+        return _json_response({"ok": False, "error": "Missing or invalid 'columns' object"})
 
+    # Columns to insert: all columns except sequence-filled PK columns (omitted so DB fills them).
+    insert_cols = [c for c in column_names if c not in pk_uses_sequence and c in col_allowlist]
     if not insert_cols:
-        return JsonResponse({"ok": False, "error": "No columns to insert"})
+        return _json_response({"ok": False, "error": "No columns to insert"})
 
-    from django.db import connections
-    conn = connections[db_alias]
-    quoted_schema = conn.ops.quote_name(schema_name)
-    quoted_table = conn.ops.quote_name(table_name)
+    # For other PK columns we require a value. For non-PK, use value or NULL if nullable.
+    # Per-column facts resolved once, not per cell: (name, coercer, is pk, is nullable)
+    column_rules = [
+        (c, _make_coercer(column_by_name[c].data_type), c in pk_set, column_by_name[c].is_nullable)
+        for c in insert_cols
+    ]
     values = []
-    for c in insert_cols:
-        val = cols.get(c)
-        if val is None or (isinstance(val, str) and val.strip() == ""):
-            values.append(None)
-        else:
-            data_type = (column_by_name.get(c) or {}).get("data_type")
-            values.append(_coerce_value(val, data_type))
+    for n, cols in enumerate(row_cols):
+        prefix = f"Row {n + 1}: " if len(row_cols) > 1 else ""
+        row_values = []
+        for c, coerce, is_pk, is_nullable in column_rules:
+            val = cols.get(c)
+            # isspace() tests for blank text without allocating a stripped copy
+            if val is None or (isinstance(val, str) and (not val or val.isspace())):
+                if is_pk:
+                    return _json_response({"ok": False, "error": f"{prefix}Primary key column '{c}' is required (no sequence)."})
+                if not is_nullable:
+                    return _json_response({"ok": False, "error": f"{prefix}Non-nullable column '{c}' requires a value."})
+                row_values.append(None)
+            else:
+                row_values.append(coerce(val))
+        values.append(row_values)
 
-    quoted_cols = [conn.ops.quote_name(c) for c in insert_cols]
-    placeholders = ["%s"] * len(insert_cols)
-    sql = f'INSERT INTO {quoted_schema}.{quoted_table} ({", ".join(quoted_cols)}) VALUES ({", ".join(placeholders)})'
+    conn = connections[db_alias]
+    quoted_schema = quote_identifier(schema_name)
+    quoted_table = quote_identifier(table_name)
+    quoted_cols = [quote_identifier(c) for c in insert_cols]
+    target_sql = f'{quoted_schema}.{quoted_table} ({", ".join(quoted_cols)})'
     try:
         with transaction.atomic(using=db_alias):
             with conn.cursor() as cur:
-                cur.execute(sql, values)
+                if len(values) > _COPY_INSERT_THRESHOLD:
+                    # COPY parses each value as its column's type, like the VALUES literals
+                    cur.copy_expert(f"COPY {target_sql} FROM STDIN", _copy_buffer(values))
+                else:
+                    # One multi-row VALUES statement per 500 rows
+                    execute_values(cur, f"INSERT INTO {target_sql} VALUES %s", values, page_size=500)
     except Exception as e:
-        return JsonResponse({"ok": False, "error": str(e)})
+        return _json_response({"ok": False, "error": str(e)})
 
-    return JsonResponse({"ok": True, "inserted": 1})
+    return _json_response({"ok": True, "inserted": len(values)})
 
 
 @login_required
@@ -626,52 +1241,55 @@ def table_delete_rows(request, db_alias, schema_name, table_name):
         return HttpResponseBadRequest("POST required")
     # Verify database ownership and ensure connection exists
     db_config = get_object_or_404(DatabaseConfig, alias=db_alias, user=request.user)
-    ensure_database_connection(db_alias, user=request.user)
+    ensure_database_connection(db_alias, user=request.user, db_config=db_config)
     
-    valid_schemas = get_schemas(db_alias, refresh=False)
-    if schema_name not in valid_schemas:
-        return HttpResponseBadRequest("Unknown schema")
-    tables = get_tables(db_alias, schema_name, refresh=False)
-    if table_name not in tables:
-        return HttpResponseBadRequest("Unknown table")
-    columns, pk_columns = get_table_meta(db_alias, schema_name, table_name, refresh=False)
+    try:
+        columns, pk_columns, _ = get_table_info(db_alias, schema_name, table_name)
+    except LookupError as e:
+        return HttpResponseBadRequest(f"Unknown {e.args[0]}")
     if not pk_columns:
-        return JsonResponse({"ok": False, "error": "Table has no primary key"})
+        return _json_response({"ok": False, "error": "Table has no primary key"})
     pk_set = set(pk_columns)
 
     try:
-        payload = json.loads(request.body)
+        payload = _json_loads(request.body)
     except json.JSONDecodeError:
-        return JsonResponse({"ok": False, "error": "Invalid JSON"})
+        return _json_response({"ok": False, "error": "Invalid JSON"})
     pks = payload.get("pks")
     if not isinstance(pks, list):
-        return JsonResponse({"ok": False, "error": "Missing or invalid 'pks' array"})
+        return _json_response({"ok": False, "error": "Missing or invalid 'pks' array"})
 
-    from django.db import connections
     conn = connections[db_alias]
-    quoted_schema = conn.ops.quote_name(schema_name)
-    quoted_table = conn.ops.quote_name(table_name)
-    deleted = 0
-    errors = []
+    quoted_schema = quote_identifier(schema_name)
+    quoted_table = quote_identifier(table_name)
+    # Validate every key before touching the table so a bad entry deletes nothing
+    errors = [
+        {"pk": pk, "error": "Invalid or missing primary key"}
+        for pk in pks
+        if not isinstance(pk, dict) or not pk_set.issubset(set(pk.keys()))
+    ]
+    if errors:
+        return _json_response({"ok": False, "errors": errors})
+    if not pks:
+        return _json_response({"ok": True, "deleted": 0})
+    key_sql = ", ".join(quote_identifier(k) for k in pk_columns)
+    sql = f'DELETE FROM {quoted_schema}.{quoted_table} WHERE ({key_sql}) IN %s'
+
+    def run(part):
+        # psycopg2 adapts the tuple of tuples to ((v1, v2), ...), one statement for all rows
+        cur.execute(sql, [tuple(tuple(pk[k] for k in pk_columns) for pk in part)])
+        return cur.rowcount
+
     try:
         with transaction.atomic(using=db_alias):
             with conn.cursor() as cur:
-                for pk in pks:
-                    if not isinstance(pk, dict) or not pk_set.issubset(set(pk.keys())):
-                        errors.append({"pk": pk, "error": "Invalid or missing primary key"})
-                        continue
-                    where_parts = [f'{conn.ops.quote_name(k)} = %s' for k in pk_columns]
-                    where_vals = [pk[k] for k in pk_columns]
-                    sql = f'DELETE FROM {quoted_schema}.{quoted_table} WHERE {" AND ".join(where_parts)}'
-                    try:
-                        cur.execute(sql, where_vals)
-                        deleted += cur.rowcount
-                    except Exception as e:
-                        errors.append({"pk": pk, "error": str(e)})
+                # One statement for all keys; if it fails, halves are retried to report
+                # the keys that fail on their own (e.g. rows still referenced)
+                deleted = _run_bisected(db_alias, run, pks, errors, lambda pk: {"pk": pk})
             if errors:
                 raise ValueError("Delete errors")
-        return JsonResponse({"ok": True, "deleted": deleted})
+        return _json_response({"ok": True, "deleted": deleted})
     except ValueError:
-        return JsonResponse({"ok": False, "errors": errors})
+        return _json_response({"ok": False, "errors": errors})
     except Exception as e:
-        return JsonResponse({"ok": False, "error": str(e)})
+        return _json_response({"ok": False, "error": str(e)})
@@ -7,27 +7,30 @@ env = environ.Env()
 environ.Env.read_env(os.path.join(BASE_DIR, ".env"))
 
 
-def _expand_allowed_hosts_ip_ranges(cidr_list):
-    """Expand CIDR ranges (e.g. 192.168.178.0/24) to a list of host IP strings."""
-    ips = []
+def _parse_ip_ranges(cidr_list):
+    """Parse CIDR ranges (e.g. 192.168.178.0/24) into ip_network objects, skipping invalid ones."""
+    networks = []
     for cidr in cidr_list:
         cidr = (cidr or "").strip()
         if not cidr:
             continue
         try:
-            network = ipaddress.ip_network(cidr, strict=False)
-            for ip in network.hosts():
-                ips.append(str(ip))
+            networks.append(ipaddress.ip_network(cidr, strict=False))
         except ValueError:
             pass
-    return ips
+    return tuple(networks)
 
 
 SECRET_KEY = env("DJANGO_SECRET_KEY")
 DEBUG = env.bool("DEBUG")
 ALLOWED_HOSTS = env.list("ALLOWED_HOSTS")
-_allowed_ranges = env.list("ALLOWED_HOSTS_IP_RANGES", default=[])
-ALLOWED_HOSTS = list(ALLOWED_HOSTS) + _expand_allowed_hosts_ip_ranges(_allowed_ranges)
+# IP ranges are matched by editor.middleware.AllowedHostNetworksMiddleware instead of
+# expanding every address into ALLOWED_HOSTS, which Django scans on each request
+ALLOWED_HOST_NETWORKS = _parse_ip_ranges(env.list("ALLOWED_HOSTS_IP_RANGES", default=[]))
+ALLOWED_HOST_NAMES = list(ALLOWED_HOSTS)
+if ALLOWED_HOST_NETWORKS:
+    # The middleware validates the host against ALLOWED_HOST_NAMES and the networks
+    ALLOWED_HOSTS = ["*"]
 
 INSTALLED_APPS = [
     "django.contrib.admin",
@@ -40,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so no other middleware reads an unvalidated host
+    "editor.middleware.AllowedHostNetworksMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -102,10 +107,24 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # EDITABLE_DATABASES is no longer used - databases are managed per-user via DatabaseConfig model
 
-CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "OPTIONS": {"MAX_ENTRIES": 500},
+# Introspection results, row counts and version stamps. LocMemCache is per process, so
+# each worker introspects on its own; set REDIS_URL to share one cache between workers.
+REDIS_URL = env("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            # A schema prefetch writes several entries per table
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
     }
-}
 INTROSPECTION_CACHE_TIMEOUT = 60
+# Seconds to keep user database connections open between requests (0 = close after each request)
+USER_DB_CONN_MAX_AGE = env.int("USER_DB_CONN_MAX_AGE", default=60)